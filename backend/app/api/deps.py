@@ -1,19 +1,22 @@
 from typing import Generator, Optional, List
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
 from app.core import security
 from app.core.config import settings
 from app.models.user import User
-from app.models.role import Role as RoleDocument
-from app.core.roles import has_permission, is_admin, is_owner, Role as RoleConstants
+from app.core.roles import get_role_permissions, has_permission, is_admin, is_owner, Role as RoleConstants
+from app.utils.role_cache import get_custom_role_permissions
+
+# Any of these grants admin access to users on a dynamic role (see require_admin)
+ADMIN_CAPABILITIES = frozenset(["roles:write", "manage_users", "view_analytics"])
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
 
-async def get_current_user(token: str = Depends(reusable_oauth2)) -> User:
+async def get_current_user(request: Request, token: str = Depends(reusable_oauth2)) -> User:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -37,24 +40,21 @@ async def get_current_user(token: str = Depends(reusable_oauth2)) -> User:
         raise HTTPException(status_code=400, detail="Inactive user")
         
     # Determine permissions
-    from app.core.roles import get_role_permissions
-    
-    all_perms = set()
-    
-    # If user has a dynamic custom role, that takes precedence (Strict Mode)
+    # If user has a dynamic custom role, that takes precedence (Strict Mode).
+    # Custom roles come from the L1/Redis role cache instead of MongoDB per request.
+    all_perms = None
     if user.role_id:
-        role_doc = await RoleDocument.get(user.role_id)
-        if role_doc:
-            all_perms.update(role_doc.permissions)
-        else:
-            # Fallback if role not found (shouldn't happen often, but safe fallback to base role)
-            all_perms.update(get_role_permissions(user.role))
-    else:
-        # Standard base role
-        all_perms.update(get_role_permissions(user.role))
+        custom_perms = await get_custom_role_permissions(user.role_id)
+        if custom_perms is not None:
+            all_perms = frozenset(custom_perms)
+    if all_perms is None:
+        # Standard base role (or fallback if the custom role no longer exists)
+        all_perms = get_role_permissions(user.role)
             
-    # Dynamically attach permissions for the request lifecycle
-    user.permissions = list(all_perms)
+    # Attach permissions for the request lifecycle; the frozenset on request.state
+    # is what the RBAC dependencies check against. user.permissions is left alone:
+    # it is the stored list, and endpoints that save() the user would persist it.
+    request.state.permissions = all_perms
     return user
 
 async def get_current_active_user(
@@ -85,16 +85,10 @@ def require_permission(permission: str):
         async def list_vendors(user: User = Depends(require_permission(Permission.VIEW_VENDORS))):
             ...
     """
-    async def permission_checker(current_user: User = Depends(get_current_user)) -> User:
-        # 1. Check hardcoded roles
-        if has_permission(current_user.role, current_user.permissions, permission):
+    async def permission_checker(request: Request, current_user: User = Depends(get_current_user)) -> User:
+        # request.state.permissions already reflects the dynamic role (see get_current_user)
+        if has_permission(current_user.role, request.state.permissions, permission):
             return current_user
-            
-        # 2. Check dynamic role if present
-        if current_user.role_id:
-            role = await RoleDocument.get(current_user.role_id)
-            if role and permission in role.permissions:
-                return current_user
 
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -122,7 +116,7 @@ def require_role(required_role: str):
     return role_checker
 
 
-async def require_admin(current_user: User = Depends(get_current_user)) -> User:
+async def require_admin(request: Request, current_user: User = Depends(get_current_user)) -> User:
     """
     Dependency to check if user is an admin or super admin.
     
@@ -136,10 +130,9 @@ async def require_admin(current_user: User = Depends(get_current_user)) -> User:
         return current_user
         
     # 2. Check dynamic role permissions
-    # Since get_current_user already populates current_user.permissions with the correct role permissions
+    # get_current_user already resolved the role permissions onto request.state, so
     # we can just check for key admin capabilities.
-    admin_permissions = ["roles:write", "manage_users", "view_analytics"]
-    if any(p in current_user.permissions for p in admin_permissions):
+    if not ADMIN_CAPABILITIES.isdisjoint(request.state.permissions):
         return current_user
 
     raise HTTPException(
@@ -208,15 +208,11 @@ async def login(
     }
 
 async def _get_merged_permissions(user: User) -> List[str]:
-    from app.core.roles import get_role_permissions
-    from app.models.role import Role as RoleDocument
+    from app.core.roles import merge_role_permissions
+    from app.utils.role_cache import get_custom_role_permissions
     
-    all_perms = set(get_role_permissions(user.role))
-    if user.role_id:
-        role_doc = await RoleDocument.get(user.role_id)
-        if role_doc:
-            all_perms.update(role_doc.permissions)
-    return list(all_perms)
+    custom_perms = await get_custom_role_permissions(user.role_id) if user.role_id else None
+    return merge_role_permissions(user.role, custom_perms)
 
 
 @router.post("/refresh", response_model=Token)
@@ -384,7 +380,7 @@ async def forgot_password(data: ForgotPassword):
     user.reset_password_token_expires_at = datetime.now(timezone.utc) + timedelta(minutes=15)
     await user.save()
     
-    await email_service.send_reset_password_email(user.email, reset_token)
+    email_service.send_reset_password_email(user.email, reset_token)
     return {"message": "If an account exists with this email, a reset link will be sent."}
 
 
@@ -492,5 +488,5 @@ async def read_users_me(
         "is_two_factor_enabled": current_user.is_two_factor_enabled,
         "role": current_user.role,
         "role_id": current_user.role_id,
-        "permissions": current_user.permissions
+        "permissions": sorted(request.state.permissions)
     }
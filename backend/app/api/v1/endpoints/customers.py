@@ -1,3 +1,6 @@
+import asyncio
+import string
+from html import escape
 from typing import List, Optional, Dict, Any, Literal, Union
 from pydantic import BaseModel
 from datetime import datetime
@@ -21,6 +24,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Max customers whose linked docs/stats are loaded concurrently in list_customers
+LIST_CONCURRENCY = 16
+
 async def find_customer(customer_id: str, tenant_id: str) -> Customer:
     """Helper to find a customer by ObjectId or readable_id within a tenant's scope."""
     # Try ObjectId first if it looks valid
@@ -149,33 +155,33 @@ async def create_customer(
 async def list_customers(current_user: User = Depends(deps.require_permission(Permission.VIEW_CUSTOMERS))):
     customers = await Customer.find(Customer.tenant_id == current_user.tenant_id).to_list()
     
-    response_list = []
-    for customer in customers:
-        dests, camps = await _fetch_linked_docs(customer)
+    # Customers are independent: overlap their lookups instead of awaiting
+    # N customers x (linked docs + stats) round-trips back to back
+    sem = asyncio.Semaphore(LIST_CONCURRENCY)
+
+    async def build(customer: Customer) -> CustomerResponse:
+        async with sem:
+            (dests, camps), camp_stats = await asyncio.gather(
+                _fetch_linked_docs(customer),
+                CustomerAnalyticsService.get_campaign_stats_for_customer(str(customer.id), current_user.tenant_id)
+            )
         
-        # We need stats for campaigns in list view? Model says CampaignWithStats
-        # Assuming list view stats are optional or simplified
         camps_with_stats = []
-        # Bulk fetch stats for this customer? 
-        # For efficiency, we should probably allow list view to omit detailed stats or fetch lightly
-        # But schema requires CampaignWithStats. 
-        # Let's fetch stats.
-        camp_stats = await CustomerAnalyticsService.get_campaign_stats_for_customer(str(customer.id), current_user.tenant_id)
-        
         for camp in camps:
             # camp is a dict now
             camp["stats"] = camp_stats.get(camp["id"])
             camps_with_stats.append(camp)
             
-        response_list.append(CustomerResponse(
+        return CustomerResponse(
             id=str(customer.id), 
             name=customer.name, 
             status=customer.status,
             readable_id=customer.readable_id,
             destinations=dests, 
             campaigns=camps_with_stats
-        ))
-    return response_list
+        )
+
+    return await asyncio.gather(*(build(customer) for customer in customers))
 
 @router.get("/{customer_id}", response_model=CustomerResponse)
 async def get_customer(
@@ -184,10 +190,11 @@ async def get_customer(
 ):
     customer = await find_customer(customer_id, current_user.tenant_id)
 
-    destinations, campaigns = await _fetch_linked_docs(customer)
-
-    # Fetch campaign stats
-    camp_stats = await CustomerAnalyticsService.get_campaign_stats_for_customer(str(customer.id), current_user.tenant_id)
+    # Fetch linked docs and campaign stats concurrently
+    (destinations, campaigns), camp_stats = await asyncio.gather(
+        _fetch_linked_docs(customer),
+        CustomerAnalyticsService.get_campaign_stats_for_customer(str(customer.id), current_user.tenant_id)
+    )
     
     # Attach stats to campaigns
     campaigns_with_stats = []
@@ -302,7 +309,7 @@ async def create_destination(
                     continue
                     
                 from app.services.email_service import send_destination_submitted_email
-                await send_destination_submitted_email(
+                send_destination_submitted_email(
                     admin_email=admin.email,
                     admin_name=admin.full_name or admin.email,
                     requester_email=current_user.email,
@@ -773,7 +780,7 @@ async def approve_destination(
             requested_user = await User.get(destination.requested_by)
             if requested_user:
                 from app.services.email_service import send_destination_approved_email
-                await send_destination_approved_email(
+                send_destination_approved_email(
                      requester_email=requested_user.email,
                      destination_name=destination.name,
                      approver_email=current_user.email
@@ -825,7 +832,7 @@ async def reject_destination(
             requested_user = await User.get(destination.requested_by)
             if requested_user:
                 from app.services.email_service import send_destination_rejected_email
-                await send_destination_rejected_email(
+                send_destination_rejected_email(
                     requester_email=requested_user.email,
                     destination_name=destination.name,
                     rejecter_email=current_user.email,
@@ -837,6 +844,30 @@ async def reject_destination(
     return {"message": "Destination rejected successfully", "destination": destination}
 
 
+# Result page for one-click email actions, built once at import
+_ACTION_PAGE = string.Template("""
+        <html>
+            <body style="font-family: sans-serif; text-align: center; padding: 50px; background-color: #f8fafc;">
+                <div style="max-width: 500px; margin: 0 auto; background: white; padding: 40px; border-radius: 12px; box-shadow: 0 4px 6px -1px rgb(0 0 0 / 0.1); $border">
+                    <h2 style="color: $title_color; margin-bottom: 20px;">$title</h2>
+                    $paragraphs
+                    <a href="$dashboard_url" style="display: inline-block; margin-top: 20px; color: #3b82f6; text-decoration: none;">$link_text</a>
+                </div>
+            </body>
+        </html>
+        """)
+
+def _action_page(title: str, title_color: str, paragraphs: List[str], link_text: str = "Go to Dashboard", border: str = "") -> str:
+    """Render _ACTION_PAGE; paragraphs are trusted HTML with user values already escaped."""
+    return _ACTION_PAGE.substitute(
+        border=border,
+        title_color=title_color,
+        title=title,
+        paragraphs="\n                    ".join(f'<p style="color: #475569;">{p}</p>' for p in paragraphs),
+        dashboard_url=escape(f"{settings.get_public_frontend_url}/"),
+        link_text=link_text
+    )
+
 @router.get("/destinations/{destination_id}/email-action", response_class=HTMLResponse)
 async def email_destination_action(
     destination_id: str,
@@ -848,34 +879,21 @@ async def email_destination_action(
     """
     expected = hashlib.sha256(f"{destination_id}{settings.SECRET_KEY}".encode()).hexdigest()
     if token != expected:
-        return """
-        <html>
-            <body style="font-family: sans-serif; text-align: center; padding: 50px; background-color: #f8fafc;">
-                <div style="max-width: 500px; margin: 0 auto; background: white; padding: 40px; border-radius: 12px; box-shadow: 0 4px 6px -1px rgb(0 0 0 / 0.1);">
-                    <h2 style="color: #e11d48; margin-bottom: 20px;">Invalid or Expired Link</h2>
-                    <p style="color: #475569;">The link you followed is invalid or has expired for security reasons.</p>
-                    <a href="{settings.get_public_frontend_url}/" style="display: inline-block; margin-top: 20px; color: #3b82f6; text-decoration: none;">Return to Dashboard</a>
-                </div>
-            </body>
-        </html>
-        """
+        return _action_page(
+            "Invalid or Expired Link", "#e11d48",
+            ["The link you followed is invalid or has expired for security reasons."],
+            link_text="Return to Dashboard"
+        )
 
     dest = await Destination.get(destination_id)
     if not dest:
         return "<html><body><h2>Destination not found</h2></body></html>"
     
     if dest.approval_status != "pending":
-        return f"""
-        <html>
-            <body style="font-family: sans-serif; text-align: center; padding: 50px; background-color: #f8fafc;">
-                <div style="max-width: 500px; margin: 0 auto; background: white; padding: 40px; border-radius: 12px; box-shadow: 0 4px 6px -1px rgb(0 0 0 / 0.1);">
-                    <h2 style="color: #334155; margin-bottom: 20px;">Action Already Taken</h2>
-                    <p style="color: #475569;">This destination has already been <strong>{dest.approval_status}</strong>.</p>
-                    <a href="{settings.get_public_frontend_url}/" style="display: inline-block; margin-top: 20px; color: #3b82f6; text-decoration: none;">Go to Dashboard</a>
-                </div>
-            </body>
-        </html>
-        """
+        return _action_page(
+            "Action Already Taken", "#334155",
+            [f"This destination has already been <strong>{escape(dest.approval_status)}</strong>."]
+        )
 
     # Fetch customer for notification context
     customer = await Customer.find_one({"destinations": destination_id})
@@ -891,24 +909,20 @@ async def email_destination_action(
             requester = await User.get(dest.requested_by)
             if requester:
                 from app.services.email_service import send_destination_approved_email
-                await send_destination_approved_email(
+                send_destination_approved_email(
                         requester_email=requester.email,
                         destination_name=dest.name,
                         approver_email="Administrator (via Email)"
                 )
         
-        return f"""
-        <html>
-            <body style="font-family: sans-serif; text-align: center; padding: 50px; background-color: #f8fafc;">
-                <div style="max-width: 500px; margin: 0 auto; background: white; padding: 40px; border-radius: 12px; box-shadow: 0 4px 6px -1px rgb(0 0 0 / 0.1); border-top: 5px solid #16a34a;">
-                    <h2 style="color: #16a34a; margin-bottom: 20px;">Successfully Approved!</h2>
-                    <p style="color: #475569;">The destination <strong>{dest.name}</strong> for <strong>{customer.name if customer else 'N/A'}</strong> has been activated.</p>
-                    <p style="color: #475569;">The requester has been notified.</p>
-                    <a href="{settings.get_public_frontend_url}/" style="display: inline-block; margin-top: 20px; color: #3b82f6; text-decoration: none;">Go to Dashboard</a>
-                </div>
-            </body>
-        </html>
-        """
+        return _action_page(
+            "Successfully Approved!", "#16a34a",
+            [
+                f"The destination <strong>{escape(dest.name)}</strong> for <strong>{escape(customer.name if customer else 'N/A')}</strong> has been activated.",
+                "The requester has been notified."
+            ],
+            border="border-top: 5px solid #16a34a;"
+        )
     else:
         dest.approval_status = "rejected"
         dest.approval_date = datetime.utcnow()
@@ -921,22 +935,18 @@ async def email_destination_action(
             requester = await User.get(dest.requested_by)
             if requester:
                 from app.services.email_service import send_destination_rejected_email
-                await send_destination_rejected_email(
+                send_destination_rejected_email(
                     requester_email=requester.email,
                     destination_name=dest.name,
                     rejecter_email="Administrator (via Email)",
                     reason=dest.rejection_reason
                 )
         
-        return f"""
-        <html>
-            <body style="font-family: sans-serif; text-align: center; padding: 50px; background-color: #f8fafc;">
-                <div style="max-width: 500px; margin: 0 auto; background: white; padding: 40px; border-radius: 12px; box-shadow: 0 4px 6px -1px rgb(0 0 0 / 0.1); border-top: 5px solid #e11d48;">
-                    <h2 style="color: #e11d48; margin-bottom: 20px;">Destination Rejected</h2>
-                    <p style="color: #475569;">The destination <strong>{dest.name}</strong> has been rejected.</p>
-                    <p style="color: #475569;">The requester has been notified.</p>
-                    <a href="{settings.get_public_frontend_url}/" style="display: inline-block; margin-top: 20px; color: #3b82f6; text-decoration: none;">Go to Dashboard</a>
-                </div>
-            </body>
-        </html>
-        """
+        return _action_page(
+            "Destination Rejected", "#e11d48",
+            [
+                f"The destination <strong>{escape(dest.name)}</strong> has been rejected.",
+                "The requester has been notified."
+            ],
+            border="border-top: 5px solid #e11d48;"
+        )
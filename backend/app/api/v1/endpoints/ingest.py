@@ -1,10 +1,21 @@
 from fastapi import APIRouter, Header, HTTPException, Depends, Request, BackgroundTasks
 from typing import Dict, Any, Optional
+from beanie import PydanticObjectId
+from pydantic import BaseModel, Field
 from app.models.vendor import Vendor
 from app.services.processing_engine import ProcessingEngine
 
 router = APIRouter()
 
+class IngestVendorView(BaseModel):
+    """
+    Projection for API key checks: ingest only needs the vendor's ids, so the
+    vendor's sources (mappings, rules, ...) are never loaded or validated here.
+    """
+    id: PydanticObjectId = Field(alias="_id")
+    owner_id: str
+    tenant_id: str
+
 async def validate_source_api_key(
     source_id: str,
     request: Request,
@@ -24,14 +35,12 @@ async def validate_source_api_key(
                 "api_key": api_key
             }
         }
-    })
+    }, projection_model=IngestVendorView)
     
     if not vendor:
         raise HTTPException(status_code=403, detail="Invalid API Key or Source ID")
         
-    # Extract the source object
-    source = next((s for s in vendor.sources if s.id == source_id), None)
-    return {"vendor": vendor, "source": source}
+    return {"vendor": vendor, "source_id": source_id}
 
 @router.api_route("/{source_id}/ingest", methods=["GET", "POST"])
 async def ingest_data(
@@ -61,7 +70,7 @@ async def ingest_data(
     # Remove api_key from payload if it was sent in query params
     payload.pop("api_key", None)
 
-    source = auth["source"]
+    source_id = auth["source_id"]
     vendor = auth["vendor"]
     owner_id = str(vendor.owner_id)
     vendor_id = str(vendor.id)
@@ -71,7 +80,7 @@ async def ingest_data(
     from app.tasks.lead_tasks import process_lead_task
     process_lead_task.delay(
         payload=payload,
-        source_id=source.id,
+        source_id=source_id,
         vendor_id=vendor_id,
         owner_id=owner_id,
         tenant_id=tenant_id
@@ -80,6 +89,6 @@ async def ingest_data(
     return {
         "status": "received",
         "message": "Lead received and queued for processing",
-        "source_id": source.id,
+        "source_id": source_id,
         "vendor_id": vendor_id
     }
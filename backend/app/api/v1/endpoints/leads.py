@@ -85,7 +85,7 @@ async def list_leads(
     leads = await Lead.find(*query).sort(-Lead.created_at).skip(skip).limit(limit).to_list()
     
     # Apply data masking for non-admin users
-    should_mask = should_mask_data(current_user.role, current_user.permissions)
+    should_mask = should_mask_data(current_user.role, request.state.permissions)
     
     if should_mask:
         # Mask sensitive data in leads
@@ -108,6 +108,7 @@ async def list_leads(
 
 @router.get("/export")
 async def export_leads(
+    request: Request,
     search: Optional[str] = None,
     vendor_id: Optional[str] = None,
     source_id: Optional[str] = None,
@@ -182,7 +183,7 @@ async def export_leads(
         sorted_data_keys = sorted(keys_result[0].get("keys", []))
 
     # Check if data should be masked
-    should_mask = should_mask_data(current_user.role, current_user.permissions)
+    should_mask = should_mask_data(current_user.role, request.state.permissions)
     
     async def generate_csv():
         output = io.StringIO()
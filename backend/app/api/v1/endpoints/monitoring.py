@@ -91,7 +91,7 @@ async def redis_information(current_user: User = Depends(deps.get_current_user))
     try:
         from app.core.redis_manager import get_cache_redis
         
-        redis = await get_cache_redis()
+        redis = get_cache_redis()
         info = await redis.info()
         
         return {
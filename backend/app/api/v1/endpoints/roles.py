@@ -7,6 +7,7 @@ from pydantic import BaseModel
 from datetime import datetime
 from app.api import deps
 from app.core.roles import Role as RoleConstants
+from app.utils.role_cache import invalidate_role_cache
 
 router = APIRouter()
 
@@ -47,6 +48,24 @@ async def require_role_admin(current_user: User = Depends(deps.get_current_user)
     raise HTTPException(status_code=403, detail="Account administrators only")
 
 
+# --------------------------
+# HELPERS
+# --------------------------
+async def _refresh_assigned_user_permissions(role: Role):
+    """
+    Recompute the stored permissions of every user assigned to this role.
+    Users are grouped by base role so each group is a single update_many.
+    """
+    from app.core.roles import merge_role_permissions
+    
+    role_id = str(role.id)
+    base_roles = await User.distinct("role", {"role_id": role_id})
+    for base_role in base_roles:
+        await User.find(User.role_id == role_id, User.role == base_role).update(
+            {"$set": {"permissions": merge_role_permissions(base_role, role.permissions)}}
+        )
+
+
 # --------------------------
 # ROUTES
 # --------------------------
@@ -65,7 +84,7 @@ async def list_roles(current_user: User = Depends(deps.get_current_user)):
             name="Admin",
             tenant_id=current_user.tenant_id,
             description="Default Admin Role",
-            permissions=get_role_permissions(RoleConstants.ADMIN),
+            permissions=sorted(get_role_permissions(RoleConstants.ADMIN)),
             is_system=True
         )
         await admin_role.create()
@@ -78,7 +97,7 @@ async def list_roles(current_user: User = Depends(deps.get_current_user)):
             name="User",
             tenant_id=current_user.tenant_id,
             description="Default User Role",
-            permissions=get_role_permissions(RoleConstants.USER),
+            permissions=sorted(get_role_permissions(RoleConstants.USER)),
             is_system=True
         )
         await user_role.create()
@@ -178,6 +197,8 @@ async def update_role(id: str, role_data: RoleModel, current_user: User = Depend
     existing.updated_at = datetime.utcnow()
     
     await existing.save()
+    await invalidate_role_cache(str(existing.id))
+    await _refresh_assigned_user_permissions(existing)
     
     return {"message": "Role updated"}
 
@@ -201,5 +222,6 @@ async def delete_role(id: str, current_user: User = Depends(require_role_admin))
         raise HTTPException(status_code=400, detail="Cannot delete role assigned to users. Reassign them first.")
         
     await existing.delete()
+    await invalidate_role_cache(str(existing.id))
     
     return {"message": "Role deleted"}
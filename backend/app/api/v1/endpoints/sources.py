@@ -2,14 +2,39 @@ from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Optional
 from datetime import datetime, timedelta
 import re
-from app.models.vendor import Vendor, Source
+from beanie import PydanticObjectId
+from app.models.vendor import Vendor, Source, SourceConfig
 from app.models.analytics import AnalyticsEvent
 from app.api import deps
 from app.models.user import User
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 router = APIRouter()
 
+class SourceStatsView(BaseModel):
+    id: str
+    name: str
+    api_key: str
+    config: SourceConfig = SourceConfig()
+    created_at: Optional[datetime] = None
+
+class VendorSourcesProjection(BaseModel):
+    """Projection for the sources table: skips source mappings, normalization and rules."""
+    id: PydanticObjectId = Field(alias="_id")
+    name: str
+    sources: List[SourceStatsView] = []
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "name": 1,
+            "sources.id": 1,
+            "sources.name": 1,
+            "sources.api_key": 1,
+            "sources.config": 1,
+            "sources.created_at": 1
+        }
+
 class SourceStatsResponse(BaseModel):
     source_id: str
     vendor_id: str
@@ -59,8 +84,8 @@ async def list_source_stats(current_user: User = Depends(deps.get_current_user))
     
     if tenant_id:
         # Find all users in this tenant
-        tenant_users = await User.find(User.tenant_id == tenant_id).to_list()
-        owner_ids_for_events = [str(u.id) for u in tenant_users]
+        cursor = User.get_pymongo_collection().find({"tenant_id": tenant_id}, {"_id": 1})
+        owner_ids_for_events = [str(d["_id"]) async for d in cursor]
         
         match_stage["owner_id"] = {"$in": owner_ids_for_events}
 
@@ -105,9 +130,9 @@ async def list_source_stats(current_user: User = Depends(deps.get_current_user))
 
     # Get all vendors (Tenant Aware)
     if tenant_id:
-        vendors = await Vendor.find(Vendor.tenant_id == tenant_id).to_list()
+        vendors = await Vendor.find(Vendor.tenant_id == tenant_id).project(VendorSourcesProjection).to_list()
     else:
-        vendors = await Vendor.find(Vendor.owner_id == str(current_user.id)).to_list()
+        vendors = await Vendor.find(Vendor.owner_id == str(current_user.id)).project(VendorSourcesProjection).to_list()
     response: List[SourceStatsResponse] = []
 
     for vendor in vendors:
@@ -249,10 +274,7 @@ async def get_source_stats_history(
                 "duplicates": {
                     "$sum": {
                         "$cond": [
-                            {"$and": [
-                                {"$eq": ["$status", "rejected"]},
-                                {"$regexMatch": {"input": "$rejection_reason", "regex": "Duplicate"}}
-                            ]}, 
+                            {"$eq": ["$is_duplicate", True]}, 
                             1, 
                             0
                         ]
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from typing import List, Optional
 from app.models.system_field import SystemField, AliasEntry
+from app.services.processing_engine import ProcessingEngine
 from app.api import deps
 from app.core.permissions import Permission
 from app.api import deps
@@ -57,6 +58,7 @@ async def create_system_field(
         tenant_id=current_user.tenant_id
     )
     await field.insert()
+    await ProcessingEngine.invalidate_alias_cache(field.tenant_id)
     return field
 
 @router.put("/{field_key}", response_model=SystemField)
@@ -93,6 +95,7 @@ async def update_system_field(
     logger.debug(f"Updated field, new aliases: {len(payload.aliases)}")
     
     await field.save()
+    await ProcessingEngine.invalidate_alias_cache(field.tenant_id)
     logger.info(f"✅ System field saved: {field_key}")
     
     return field
@@ -110,4 +113,5 @@ async def delete_system_field(
         raise HTTPException(status_code=404, detail="System field not found")
     
     await field.delete()
+    await ProcessingEngine.invalidate_alias_cache(field.tenant_id)
     return {"message": "Field deleted"}
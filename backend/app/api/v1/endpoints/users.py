@@ -5,22 +5,29 @@ Handles user invitations, role management, and user administration.
 
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
 from typing import List, Optional
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime, timedelta
 from app.models.user import User
 from app.api import deps
 from app.core.permissions import Permission
-from app.core.roles import Role, get_role_permissions
+from app.core.roles import Role, get_role_permissions, merge_role_permissions
 from app.core.security import get_password_hash, create_access_token
+import asyncio
 import secrets
 import logging
 from app.utils.cache import invalidate_cache
-from app.models.role import Role as RoleDocument
+from app.utils.role_cache import get_custom_role_permissions
 from beanie import PydanticObjectId
+from beanie.operators import In
+from pymongo.errors import BulkWriteError
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Role sets used for request validation
+VALID_ROLES = frozenset({Role.SUPER_ADMIN, Role.OWNER, Role.ADMIN, Role.USER})
+ADMIN_ROLES = frozenset({Role.OWNER, Role.SUPER_ADMIN})
+
 
 # Pydantic Models
 
@@ -37,6 +44,21 @@ class UserInviteResponse(BaseModel):
     expires_at: datetime
 
 
+class BulkUserInvite(BaseModel):
+    invites: List[UserInvite] = Field(max_length=100)
+
+
+class BulkInvitationResult(BaseModel):
+    email: str
+    invitation_token: str
+    expires_at: datetime
+
+
+class BulkUserInviteResponse(BaseModel):
+    message: str
+    invitations: List[BulkInvitationResult]
+
+
 class AcceptInvitation(BaseModel):
     token: str
     password: str
@@ -48,6 +70,11 @@ class UpdateUserRole(BaseModel):
     role_id: Optional[str] = None
 
 
+class UserEmailView(BaseModel):
+    """Projection used for email existence checks."""
+    email: str
+
+
 class UserResponse(BaseModel):
     id: str
     email: str
@@ -63,75 +90,153 @@ class UserResponse(BaseModel):
 
 # Endpoints
 
-@router.post("/invite", response_model=UserInviteResponse)
-async def invite_user(
-    payload: UserInvite,
-    current_user: User = Depends(deps.require_admin)
-):
+async def _validate_invite_role(invite: UserInvite, current_user: User) -> Optional[List[str]]:
     """
-    Invite a new user to the platform (Admin/Owner only).
-    Sends an email invitation with a secure token.
+    Validate the role of an invitation and return the custom role's permissions (if any).
+    Normalizes invite.role to the base role used for custom roles.
     """
-    # Check if user already exists
-    existing_user = await User.find_one(User.email == payload.email)
-    if existing_user:
-        raise HTTPException(status_code=400, detail="User with this email already exists")
-    
-    
-    # Validate role
+    custom_permissions = None
     # If role_id is provided, validate it exists
-    if payload.role_id:
-        role_doc = await RoleDocument.get(payload.role_id)
-        if not role_doc:
+    if invite.role_id:
+        custom_permissions = await get_custom_role_permissions(invite.role_id)
+        if custom_permissions is None:
             raise HTTPException(status_code=400, detail="Invalid role ID")
         # For dynamic roles, we can use "user" as the base role or "custom"
         # but let's stick to "user" for now as the fallback
-        payload.role = Role.USER 
-    elif payload.role not in [Role.SUPER_ADMIN, Role.OWNER, Role.ADMIN, Role.USER]:
+        invite.role = Role.USER 
+    elif invite.role not in VALID_ROLES:
         raise HTTPException(status_code=400, detail=f"Invalid role. Must be one of: {Role.SUPER_ADMIN}, {Role.OWNER}, {Role.ADMIN}, {Role.USER}")
     
     # Only owner can create other owners (or maybe restrict to 1 owner per tenant?)
-    if payload.role == Role.OWNER and current_user.role != Role.OWNER:
+    if invite.role == Role.OWNER and current_user.role != Role.OWNER:
          raise HTTPException(status_code=403, detail="Only owners can invite other owners")
-
-    # Generate secure invitation token
-    invitation_token = secrets.token_urlsafe(32)
-    invitation_expires = datetime.utcnow() + timedelta(hours=24)
     
-    # Create user with pending status
-    new_user = User(
-        email=payload.email,
-        full_name=payload.full_name,
+    return custom_permissions
+
+
+def _build_invited_user(invite: UserInvite, custom_permissions: Optional[List[str]], current_user: User) -> User:
+    """Create a pending User with a fresh invitation token (not yet inserted)."""
+    return User(
+        email=invite.email,
+        full_name=invite.full_name,
         hashed_password="",  # Will be set when invitation is accepted
-        role=payload.role,
-        role_id=payload.role_id,
+        role=invite.role,
+        role_id=invite.role_id,
+        permissions=merge_role_permissions(invite.role, custom_permissions),
         invited_by=str(current_user.id),
         tenant_id=current_user.tenant_id,  # Assign to inviter's tenant
-        invitation_token=invitation_token,
-        invitation_expires=invitation_expires,
+        invitation_token=secrets.token_urlsafe(32),
+        invitation_expires=datetime.utcnow() + timedelta(hours=24),
         is_active=False,  # Activated when invitation is accepted
         is_verified=False
     )
-    
-    await new_user.insert()
-    
-    # Send invitation email (background task)
-    # Send invitation email (Celery task)
+
+
+def _queue_invitation_email(background_tasks: BackgroundTasks, user: User, current_user: User):
+    """Send invitation email after the response is sent (dispatches the Celery task)."""
     from app.services.email_service import send_invitation_email
-    await send_invitation_email(
-        email=payload.email,
-        full_name=payload.full_name,
-        invitation_token=invitation_token,
+    background_tasks.add_task(
+        send_invitation_email,
+        email=user.email,
+        full_name=user.full_name,
+        invitation_token=user.invitation_token,
         invited_by=current_user.full_name or current_user.email,
-        role=payload.role
+        role=user.role
     )
+
+
+@router.post("/invite", response_model=UserInviteResponse)
+async def invite_user(
+    payload: UserInvite,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(deps.require_admin)
+):
+    """
+    Invite a new user to the platform (Admin/Owner only).
+    Sends an email invitation with a secure token.
+    """
+    # Check if user already exists (index-only lookup on the unique email index)
+    if await User.get_pymongo_collection().count_documents({"email": payload.email}, limit=1):
+        raise HTTPException(status_code=400, detail="User with this email already exists")
+    
+    # Validate role
+    custom_permissions = await _validate_invite_role(payload, current_user)
+
+    # Create user with pending status
+    new_user = _build_invited_user(payload, custom_permissions, current_user)
+    await new_user.insert()
+    
+    _queue_invitation_email(background_tasks, new_user, current_user)
     
     logger.info(f"User invited: {payload.email} by {current_user.email} with role {payload.role}")
     
     return UserInviteResponse(
         message="Invitation sent successfully",
-        invitation_token=invitation_token,
-        expires_at=invitation_expires
+        invitation_token=new_user.invitation_token,
+        expires_at=new_user.invitation_expires
+    )
+
+
+@router.post("/invite/bulk", response_model=BulkUserInviteResponse)
+async def bulk_invite_users(
+    payload: BulkUserInvite,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(deps.require_admin)
+):
+    """
+    Invite several users at once (Admin/Owner only).
+    All invitations are validated up-front and inserted in a single batch.
+    If any invitation is invalid, or an email is taken by a concurrent request
+    during the insert, the users already inserted are removed and no users
+    are created.
+    """
+    if not payload.invites:
+        raise HTTPException(status_code=400, detail="No invitations provided")
+    
+    emails = [invite.email for invite in payload.invites]
+    if len(set(emails)) != len(emails):
+        raise HTTPException(status_code=400, detail="Duplicate emails in invitation list")
+    
+    # Check for existing users with a single query
+    existing_users = await User.find(In(User.email, emails)).project(UserEmailView).to_list()
+    if existing_users:
+        existing_emails = ", ".join(u.email for u in existing_users)
+        raise HTTPException(status_code=400, detail=f"Users with these emails already exist: {existing_emails}")
+    
+    # Validate roles (custom role lookups are cached)
+    custom_permissions = [
+        await _validate_invite_role(invite, current_user) for invite in payload.invites
+    ]
+    
+    new_users = [
+        _build_invited_user(invite, perms, current_user)
+        for invite, perms in zip(payload.invites, custom_permissions)
+    ]
+    try:
+        await User.insert_many(new_users)
+    except BulkWriteError as e:
+        # The batch is ordered, so the first nInserted users went in before the
+        # failure; remove them so the request stays all-or-nothing
+        inserted = e.details.get("nInserted", 0)
+        if inserted:
+            await User.find(In(User.email, emails[:inserted])).delete()
+        raise HTTPException(status_code=400, detail="One or more of these emails was registered concurrently; no users were invited")
+    
+    for new_user in new_users:
+        _queue_invitation_email(background_tasks, new_user, current_user)
+    
+    logger.info(f"{len(new_users)} users invited by {current_user.email}")
+    
+    return BulkUserInviteResponse(
+        message=f"{len(new_users)} invitations sent successfully",
+        invitations=[
+            BulkInvitationResult(
+                email=u.email,
+                invitation_token=u.invitation_token,
+                expires_at=u.invitation_expires
+            )
+            for u in new_users
+        ]
     )
 
 
@@ -180,7 +285,8 @@ async def accept_invitation(payload: AcceptInvitation):
         raise HTTPException(status_code=400, detail="Invitation already accepted")
     
     # Set password and activate account
-    user.hashed_password = get_password_hash(payload.password)
+    # bcrypt is CPU-bound; hash in a worker thread so the event loop keeps serving requests
+    user.hashed_password = await asyncio.to_thread(get_password_hash, payload.password)
     if payload.full_name:
         user.full_name = payload.full_name
     user.is_active = True
@@ -209,28 +315,23 @@ async def accept_invitation(payload: AcceptInvitation):
     }
 
 
-async def _to_user_response(user: User) -> UserResponse:
-    """Helper to convert User and Role to UserResponse with merged permissions."""
-    from app.core.roles import get_role_permissions
-    
-    all_perms = set(get_role_permissions(user.role))
-    if user.role_id:
-        role_doc = await RoleDocument.get(user.role_id)
-        if role_doc:
-            all_perms.update(role_doc.permissions)
-            
-    return UserResponse(
-        id=str(user.id),
-        email=user.email,
-        full_name=user.full_name,
-        role=user.role,
-        role_id=user.role_id,
-        permissions=list(all_perms),
-        is_active=user.is_active,
-        is_verified=user.is_verified,
-        invited_by=user.invited_by,
-        created_at=user.created_at
-    )
+def _to_user_response(user: User) -> dict:
+    """
+    Helper to convert User to a UserResponse-shaped dict using its stored merged permissions.
+    Returned as a plain dict so response_model validation runs only once.
+    """
+    return {
+        "id": str(user.id),
+        "email": user.email,
+        "full_name": user.full_name,
+        "role": user.role,
+        "role_id": user.role_id,
+        "permissions": user.permissions or list(get_role_permissions(user.role)),
+        "is_active": user.is_active,
+        "is_verified": user.is_verified,
+        "invited_by": user.invited_by,
+        "created_at": user.created_at
+    }
 
 
 @router.get("/", response_model=List[UserResponse])
@@ -242,28 +343,28 @@ async def list_users(
     """
     users = await User.find(User.tenant_id == current_user.tenant_id).to_list()
     
-    return [await _to_user_response(user) for user in users]
+    return [_to_user_response(user) for user in users]
 
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
-    user_id: str,
+    user_id: PydanticObjectId,
     current_user: User = Depends(deps.require_admin)
 ):
     """
     Get user details by ID within tenant (Admin only).
     """
-    user = await User.find_one(User.id == PydanticObjectId(user_id), User.tenant_id == current_user.tenant_id)
+    user = await User.find_one(User.id == user_id, User.tenant_id == current_user.tenant_id)
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return await _to_user_response(user)
+    return _to_user_response(user)
 
 
 @router.put("/{user_id}/role", response_model=UserResponse)
 async def update_user_role(
-    user_id: str,
+    user_id: PydanticObjectId,
     payload: UpdateUserRole,
     current_user: User = Depends(deps.require_admin)
 ):
@@ -277,16 +378,17 @@ async def update_user_role(
         raise HTTPException(status_code=404, detail="User not found")
 
     # Only Owner or Super Admin can update roles
-    if current_user.role not in [Role.OWNER, Role.SUPER_ADMIN]:
+    if current_user.role not in ADMIN_ROLES:
         raise HTTPException(status_code=403, detail="Only Owners can manage user roles")
     
     # Validate role
+    custom_permissions = None
     if payload.role_id:
-        role_doc = await RoleDocument.get(payload.role_id)
-        if not role_doc:
+        custom_permissions = await get_custom_role_permissions(payload.role_id)
+        if custom_permissions is None:
             raise HTTPException(status_code=400, detail="Invalid role ID")
         payload.role = Role.USER # Fallback
-    elif payload.role not in [Role.SUPER_ADMIN, Role.OWNER, Role.ADMIN, Role.USER]:
+    elif payload.role not in VALID_ROLES:
         raise HTTPException(status_code=400, detail=f"Invalid role. Must be one of: {Role.SUPER_ADMIN}, {Role.OWNER}, {Role.ADMIN}, {Role.USER}")
     
     # Only owner can promote to owner
@@ -305,22 +407,35 @@ async def update_user_role(
     if str(user.id) == str(current_user.id):
         raise HTTPException(status_code=400, detail="Cannot modify your own role")
     
-    # Update role
+    # Nothing to do if the role is unchanged (skip the write and cache invalidation)
+    if payload.role == user.role and payload.role_id == user.role_id:
+        return _to_user_response(user)
+    
+    # Update role (send only the changed fields)
     user.role = payload.role
     user.role_id = payload.role_id
-    user.updated_at = datetime.utcnow()
-    
-    await user.save()
+    user.permissions = merge_role_permissions(payload.role, custom_permissions)
+    
+    await User.find_one(User.id == user.id).update(
+        {
+            "$set": {
+                "role": user.role,
+                "role_id": user.role_id,
+                "permissions": user.permissions
+            },
+            "$currentDate": {"updated_at": True}
+        }
+    )
     await invalidate_cache(f"fastapi-cache:{user.id}:/api/v1/auth/me")
     
     logger.info(f"User role updated: {user.email} -> {payload.role} by {current_user.email}")
     
-    return await _to_user_response(user)
+    return _to_user_response(user)
 
 
 @router.delete("/{user_id}")
 async def deactivate_user(
-    user_id: str,
+    user_id: PydanticObjectId,
     current_user: User = Depends(deps.require_admin)
 ):
     """
@@ -333,7 +448,7 @@ async def deactivate_user(
         raise HTTPException(status_code=404, detail="User not found")
 
     # Only Owner or Super Admin can deactivate users
-    if current_user.role not in [Role.OWNER, Role.SUPER_ADMIN]:
+    if current_user.role not in ADMIN_ROLES:
         raise HTTPException(status_code=403, detail="Only Owners can deactivate users")
     
     # Only super admin can deactivate super admin accounts
@@ -349,10 +464,12 @@ async def deactivate_user(
         raise HTTPException(status_code=400, detail="Cannot deactivate your own account")
     
     # Deactivate user
-    user.is_active = False
-    user.updated_at = datetime.utcnow()
-    
-    await user.save()
+    await User.find_one(User.id == user.id).update(
+        {
+            "$set": {"is_active": False},
+            "$currentDate": {"updated_at": True}
+        }
+    )
     await invalidate_cache(f"fastapi-cache:{user.id}:/api/v1/auth/me")
     
     logger.info(f"User deactivated: {user.email} by {current_user.email}")
@@ -362,7 +479,7 @@ async def deactivate_user(
 
 @router.post("/{user_id}/reactivate")
 async def reactivate_user(
-    user_id: str,
+    user_id: PydanticObjectId,
     current_user: User = Depends(deps.require_admin)
 ):
     """
@@ -374,17 +491,19 @@ async def reactivate_user(
         raise HTTPException(status_code=404, detail="User not found")
 
     # Only Owner or Super Admin can reactivate users
-    if current_user.role not in [Role.OWNER, Role.SUPER_ADMIN]:
+    if current_user.role not in ADMIN_ROLES:
         raise HTTPException(status_code=403, detail="Only Owners can reactivate users")
     
     if user.is_active:
         raise HTTPException(status_code=400, detail="User is already active")
     
     # Reactivate user
-    user.is_active = True
-    user.updated_at = datetime.utcnow()
-    
-    await user.save()
+    await User.find_one(User.id == user.id).update(
+        {
+            "$set": {"is_active": True},
+            "$currentDate": {"updated_at": True}
+        }
+    )
     await invalidate_cache(f"fastapi-cache:{user.id}:/api/v1/auth/me")
     
     logger.info(f"User reactivated: {user.email} by {current_user.email}")
@@ -394,7 +513,7 @@ async def reactivate_user(
 
 @router.delete("/{user_id}/permanent")
 async def delete_user_permanently(
-    user_id: str,
+    user_id: PydanticObjectId,
     current_user: User = Depends(deps.require_admin)
 ):
     """
@@ -407,7 +526,7 @@ async def delete_user_permanently(
         raise HTTPException(status_code=404, detail="User not found")
 
     # Only Owner or Super Admin can delete users
-    if current_user.role not in [Role.OWNER, Role.SUPER_ADMIN]:
+    if current_user.role not in ADMIN_ROLES:
         raise HTTPException(status_code=403, detail="Only Owners can permanently delete users")
     
     # Only super admin can delete super admin accounts
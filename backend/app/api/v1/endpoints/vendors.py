@@ -1,18 +1,31 @@
-from typing import List, Optional, Dict, Any, Literal, Union
-from pydantic import BaseModel
+from typing import List, Optional, Dict, Any, Literal, Union, Tuple
+from pydantic import BaseModel, Field
 from datetime import datetime, timedelta
 import re
-from app.models.vendor import Vendor, Source, generate_readable_id
+import asyncio
+import time
+from functools import lru_cache
+from app.models.vendor import Vendor, Source, SourceConfig, SourceValidationConfig, generate_readable_id
+from app.models.mapping import SourceMapping
+from app.models.rules import SourceRules
+from app.models.lead import Lead
+from app.models.lead_daily_stats import LeadDailyStats
 from app.models.user import User
 from app.models.analytics import AnalyticsEvent
 from app.services.unknown_field_service import UnknownFieldService
 from app.api import deps
 from app.core.permissions import Permission
+from app.utils.cache import cache, invalidate_by_tags
+from app.utils.cache_tags import vendor_stats_tag, source_stats_tag, tenant_tag
 
 from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.responses import ORJSONResponse
 from beanie import PydanticObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 class VendorCreate(BaseModel):
     name: str
@@ -24,6 +37,39 @@ class VendorResponse(BaseModel):
     status: str
     sources: List[Source]
 
+class SourceSummary(BaseModel):
+    id: str
+    readable_id: Optional[str] = None
+    name: str
+    type: str = "api"
+
+class VendorListProjection(BaseModel):
+    """Projection for the vendor list: skips source configs, mappings and rules."""
+    id: PydanticObjectId = Field(alias="_id")
+    readable_id: Optional[str] = None
+    name: str
+    status: str = "enabled"
+    sources: List[SourceSummary] = []
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "readable_id": 1,
+            "name": 1,
+            "status": 1,
+            "sources.id": 1,
+            "sources.readable_id": 1,
+            "sources.name": 1,
+            "sources.type": 1
+        }
+
+class VendorListResponse(BaseModel):
+    id: str
+    readable_id: Optional[str] = None
+    name: str
+    status: str
+    sources: List[SourceSummary]
+
 class VendorStatsResponse(BaseModel):
     id: str
     readable_id: Optional[str] = None
@@ -43,9 +89,10 @@ class VendorStatsResponse(BaseModel):
 
 class PaginatedVendorStatsResponse(BaseModel):
     items: List[VendorStatsResponse]
-    total: int
+    total: Optional[int] = None  # None when exact_count=false
     page: int
-    pages: int
+    pages: Optional[int] = None
+    has_more: bool = False
 
 class SourceCreate(BaseModel):
     name: str
@@ -89,21 +136,101 @@ class PaginatedVendorSourceStatsResponse(BaseModel):
     page: int
     pages: int
 
-async def find_vendor(vendor_id: str, tenant_id: str) -> Vendor:
-    """Helper to find a vendor by ObjectId or readable_id within a tenant's scope."""
-    from beanie import PydanticObjectId
-    
-    # Try ObjectId first
+READABLE_ID_RETRIES = 3
+
+# Cursor batch size for lead stats aggregations (one row per source / per day)
+STATS_BATCH_SIZE = 200
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+def _lead_age_stage(now: datetime) -> dict:
+    """
+    Stats pipeline stage computing each lead's age (ms) and processed flag once,
+    so every time bucket in the following $group is a single numeric compare.
+    """
+    return {
+        "$addFields": {
+            "_age_ms": {"$subtract": [now, "$created_at"]},
+            "_processed": {"$eq": ["$status", "processed"]}
+        }
+    }
+
+@lru_cache(maxsize=1)
+def _time_buckets(minute_epoch: int) -> Tuple[dict, int, int]:
+    """
+    Age stage plus "today"/"yesterday" cutoffs (ms) for the stats pipelines.
+
+    `now` is truncated to the minute, so every stats request within that
+    minute reuses the same objects and sends identical pipeline literals.
+    """
+    now = datetime.fromtimestamp(minute_epoch * 60)
+    start_today = datetime(now.year, now.month, now.day)
+    start_yesterday = start_today - timedelta(days=1)
+    today_ms = (now - start_today) // timedelta(milliseconds=1)
+    yesterday_ms = (now - start_yesterday) // timedelta(milliseconds=1)
+    return _lead_age_stage(now), today_ms, yesterday_ms
+
+@lru_cache(maxsize=256)
+def _prefix_pattern(search: str, ignore_case: bool = True) -> re.Pattern:
+    """Anchored prefix regex for a lead search term."""
+    return re.compile("^" + re.escape(search), re.IGNORECASE if ignore_case else 0)
+
+PHONE_SEARCH_RE = re.compile(r"^[\d\s()+.-]+$")
+
+def _lead_search_filter(search: str) -> Dict[str, Any]:
+    """
+    Lead search as anchored prefix regexes. Phone-shaped terms have no case,
+    so they use a case-sensitive prefix that the (tenant_id, data.phone) index
+    can bound tightly; every other term is a case-insensitive $or. A pasted
+    lead id also matches _id exactly.
+    """
+    search = search.strip()
+    if PHONE_SEARCH_RE.match(search):
+        term_filter = {"data.phone": _prefix_pattern(search, ignore_case=False)}
+    elif "@" in search:
+        term_filter = {"data.email": _prefix_pattern(search)}
+    else:
+        pattern = _prefix_pattern(search)
+        term_filter = {"$or": [
+            {field: pattern}
+            for field in ("status", "data.email", "data.phone", "data.first_name", "data.last_name")
+        ]}
+    if PydanticObjectId.is_valid(search):
+        return {"$or": [{"_id": PydanticObjectId(search)}, term_filter]}
+    return term_filter
+
+def _count_if(*conditions) -> dict:
+    """$group accumulator counting documents matching all conditions."""
+    return {"$sum": {"$cond": [{"$and": list(conditions)}, 1, 0]}}
+
+async def invalidate_stats_cache(tenant_id: str):
+    """Drop the tenant's cached vendor/source stats after a vendor or source change."""
+    await invalidate_by_tags([
+        tenant_tag(vendor_stats_tag(), tenant_id),
+        tenant_tag(source_stats_tag(), tenant_id)
+    ])
+
+class VendorIdView(BaseModel):
+    """Projection for call sites that only need the vendor's _id."""
+    id: PydanticObjectId = Field(alias="_id")
+
+def _vendor_match(vendor_id: str, tenant_id: str) -> Dict[str, Any]:
+    """Raw filter matching a vendor by ObjectId or readable_id within a tenant."""
+    candidates: List[Dict[str, Any]] = [{"readable_id": vendor_id}]
     try:
-        oid = PydanticObjectId(vendor_id)
-        vendor = await Vendor.find_one(Vendor.id == oid, Vendor.tenant_id == tenant_id)
-        if vendor:
-            return vendor
-    except:
+        candidates.insert(0, {"_id": PydanticObjectId(vendor_id)})
+    except (InvalidId, TypeError):
         pass
-        
-    # Fallback to readable_id
-    vendor = await Vendor.find_one(Vendor.readable_id == vendor_id, Vendor.tenant_id == tenant_id)
+    return {"tenant_id": tenant_id, "$or": candidates}
+
+async def find_vendor(vendor_id: str, tenant_id: str, projection: Optional[type] = None) -> Vendor:
+    """
+    Helper to find a vendor by ObjectId or readable_id within a tenant's scope.
+
+    Both identifiers are matched in a single query. Pass a `projection` model
+    (e.g. VendorIdView) when the caller does not need the sources.
+    """
+    vendor = await Vendor.find_one(_vendor_match(vendor_id, tenant_id), projection_model=projection)
     if not vendor:
         raise HTTPException(status_code=404, detail="Vendor not found")
     return vendor
@@ -113,18 +240,27 @@ async def create_vendor(
     vendor_in: VendorCreate,
     current_user: User = Depends(deps.require_permission(Permission.CREATE_VENDORS))
 ):
-    from app.models.vendor import generate_readable_id
     vendor = Vendor(
         name=vendor_in.name, 
         readable_id=generate_readable_id("VND"),
         owner_id=str(current_user.id),
         tenant_id=current_user.tenant_id
     )
-    await vendor.create()
+    # readable_id is unique per tenant; retry with a fresh id on the rare collision
+    for attempt in range(READABLE_ID_RETRIES):
+        try:
+            await vendor.create()
+            break
+        except DuplicateKeyError:
+            if attempt == READABLE_ID_RETRIES - 1:
+                raise HTTPException(status_code=409, detail="Could not allocate a vendor ID, please retry")
+            await asyncio.sleep(0.05 * 2 ** attempt)
+            vendor.readable_id = generate_readable_id("VND")
+    await invalidate_stats_cache(current_user.tenant_id)
 
     return VendorResponse(id=str(vendor.id), readable_id=vendor.readable_id, name=vendor.name, status=vendor.status, sources=vendor.sources)
 
-@router.get("/", response_model=List[VendorResponse])
+@router.get("/", response_model=List[VendorListResponse])
 
 async def list_vendors(
     request: Request,
@@ -132,144 +268,119 @@ async def list_vendors(
     current_user: User = Depends(deps.require_permission(Permission.VIEW_VENDORS))
 ):
 
-    vendors = await Vendor.find(Vendor.tenant_id == current_user.tenant_id).to_list()
-    return [VendorResponse(id=str(v.id), readable_id=v.readable_id, name=v.name, status=v.status, sources=v.sources) for v in vendors]
+    vendors = await Vendor.find(Vendor.tenant_id == current_user.tenant_id).project(VendorListProjection).to_list()
+    return [
+        VendorListResponse(
+            id=str(v.id),
+            readable_id=v.readable_id,
+            name=v.name,
+            status=v.status,
+            sources=v.sources
+        )
+        for v in vendors
+    ]
 
 @router.get("/stats", response_model=PaginatedVendorStatsResponse)
-
+@cache(ttl=30, tags=[vendor_stats_tag()], tenant_scoped=True)
 async def list_vendor_stats(
     request: Request,
     response: Response,
     limit: int = 100,
     skip: int = 0,
     search: Optional[str] = None,
+    exact_count: bool = True,
     current_user: User = Depends(deps.require_permission(Permission.VIEW_VENDORS))
 ):
 
     """
     Returns vendor metrics for the Vendors table with pagination and search.
-    Now computed from the Lead collection, optimized for performance.
+    Computed from one vendor aggregation: filter + pagination + per-vendor
+    lead stats (via $lookup) + total count ($facet when searching, else a
+    concurrent count_documents).
     """
-    # 1. Fetch all vendors for this tenant and apply search filter
-    all_vendors = await Vendor.find(Vendor.tenant_id == current_user.tenant_id).to_list()
-    
-    filtered_vendors = all_vendors
-    if search:
-        q = search.lower()
-        filtered_vendors = [
-            v for v in all_vendors 
-            if q in v.name.lower() or q in str(v.id).lower() or (v.readable_id and q in v.readable_id.lower())
-        ]
-    
-    total_filtered = len(filtered_vendors)
-    
-    # 2. Slice for pagination
-    # Default sorting or logic could be added here if needed
-    paginated_vendors = filtered_vendors[skip : skip + limit]
-    
-    vendor_ids = [str(v.id) for v in paginated_vendors]
-    
-    if not vendor_ids:
-        return PaginatedVendorStatsResponse(
-            items=[],
-            total=total_filtered,
-            page=(skip // limit) + 1,
-            pages=(total_filtered + limit - 1) // limit if total_filtered > 0 else 0
-        )
+    tenant_id = current_user.tenant_id
+    age_stage, today_ms, yesterday_ms = _time_buckets(int(time.time() // 60))
 
-    # 3. Lead stats aggregation (only for the paginated slice)
-    now = datetime.now()
-    start_today = datetime(now.year, now.month, now.day)
-    start_yesterday = start_today - timedelta(days=1)
-    
-    pipeline = [
-        {
-            "$match": {
-                "vendor_id": {"$in": vendor_ids},
-                "tenant_id": current_user.tenant_id
-            }
-        },
-        {
-            "$group": {
-                "_id": "$vendor_id",
-                "total_leads": {
-                    "$sum": {"$cond": [{"$eq": ["$status", "processed"]}, 1, 0]}
-                },
-                "total_duplicates": {
-                    "$sum": {
-                        "$cond": [
-                            {"$and": [
-                                {"$eq": ["$status", "rejected"]},
-                                {"$regexMatch": {"input": "$rejection_reason", "regex": "Duplicate"}}
-                            ]}, 
-                            1, 
-                            0
-                        ]
-                    }
-                },
-                "leads_today": {
-                    "$sum": {
-                        "$cond": [
-                            {"$and": [
-                                {"$eq": ["$status", "processed"]},
-                                {"$gte": ["$created_at", start_today]}
-                            ]},
-                            1,
-                            0
-                        ]
-                    }
-                },
-                "duplicates_today": {
-                    "$sum": {
-                        "$cond": [
-                            {"$and": [
-                                {"$eq": ["$status", "rejected"]},
-                                {"$regexMatch": {"input": "$rejection_reason", "regex": "Duplicate"}},
-                                {"$gte": ["$created_at", start_today]}
-                            ]},
-                            1,
-                            0
-                        ]
-                    }
-                },
-                "leads_yesterday": {
-                    "$sum": {
-                        "$cond": [
-                            {"$and": [
-                                {"$eq": ["$status", "processed"]},
-                                {"$gte": ["$created_at", start_yesterday]},
-                                {"$lt": ["$created_at", start_today]}
-                            ]},
-                            1,
-                            0
-                        ]
+    # 1. Tenant + search filter in a single $match so it runs on the tenant_id index.
+    # The term is a case-insensitive substring on name and readable_id; a pasted
+    # ObjectId also matches _id exactly.
+    match: Dict[str, Any] = {"tenant_id": tenant_id}
+    if search:
+        pattern = {"$regex": re.escape(search), "$options": "i"}
+        match["$or"] = [{"name": pattern}, {"readable_id": pattern}]
+        if PydanticObjectId.is_valid(search):
+            match["$or"].insert(0, {"_id": PydanticObjectId(search)})
+    pipeline: List[Dict[str, Any]] = [{"$match": match}]
+
+    # 2. Paginate vendors and join lead stats only for the current page
+    page_stages = [
+        {"$skip": skip},
+        {"$limit": limit},
+        {"$project": {"readable_id": 1, "name": 1, "status": 1, "_sid": {"$toString": "$_id"}}},
+        {"$lookup": {
+            "from": "leads",
+            "localField": "_sid",
+            "foreignField": "vendor_id",
+            "pipeline": [
+                {"$match": {"tenant_id": tenant_id}},
+                age_stage,
+                {
+                    "$group": {
+                        "_id": None,
+                        "total_leads": _count_if("$_processed"),
+                        "total_duplicates": _count_if("$is_duplicate"),
+                        "leads_today": _count_if("$_processed", {"$lte": ["$_age_ms", today_ms]}),
+                        "duplicates_today": _count_if("$is_duplicate", {"$lte": ["$_age_ms", today_ms]}),
+                        "leads_yesterday": _count_if(
+                            "$_processed",
+                            {"$gt": ["$_age_ms", today_ms]},
+                            {"$lte": ["$_age_ms", yesterday_ms]}
+                        ),
+                        "last_7_days": _count_if("$_processed", {"$lte": ["$_age_ms", 7 * DAY_MS]}),
+                        "last_30_days": _count_if("$_processed", {"$lte": ["$_age_ms", 30 * DAY_MS]}),
+                        "last_90_days": _count_if("$_processed", {"$lte": ["$_age_ms", 90 * DAY_MS]}),
+                        "last_180_days": _count_if("$_processed", {"$lte": ["$_age_ms", 180 * DAY_MS]}),
+                        "last_365_days": _count_if("$_processed", {"$lte": ["$_age_ms", 365 * DAY_MS]}),
                     }
-                },
-                "last_7_days": {"$sum": {"$cond": [{"$and": [{"$eq": ["$status", "processed"]}, {"$gte": ["$created_at", now - timedelta(days=7)]}]}, 1, 0]}},
-                "last_30_days": {"$sum": {"$cond": [{"$and": [{"$eq": ["$status", "processed"]}, {"$gte": ["$created_at", now - timedelta(days=30)]}]}, 1, 0]}},
-                "last_90_days": {"$sum": {"$cond": [{"$and": [{"$eq": ["$status", "processed"]}, {"$gte": ["$created_at", now - timedelta(days=90)]}]}, 1, 0]}},
-                "last_180_days": {"$sum": {"$cond": [{"$and": [{"$eq": ["$status", "processed"]}, {"$gte": ["$created_at", now - timedelta(days=180)]}]}, 1, 0]}},
-                "last_365_days": {"$sum": {"$cond": [{"$and": [{"$eq": ["$status", "processed"]}, {"$gte": ["$created_at", now - timedelta(days=365)]}]}, 1, 0]}},
-            }
-        }
+                }
+            ],
+            "as": "stats"
+        }}
     ]
 
-    from app.models.lead import Lead
-    stats_rows = await Lead.get_pymongo_collection().aggregate(pipeline).to_list(None)
-    stats_by_vendor_id = {row["_id"]: row for row in stats_rows}
+    collection = Vendor.get_pymongo_collection()
+    if search:
+        pipeline.append({"$facet": {"items": page_stages, "total": [{"$count": "n"}]}})
+        results = await collection.aggregate(pipeline).to_list(1)
+        result = results[0] if results else {}
+        vendor_rows = result.get("items", [])
+        total_filtered = result["total"][0]["n"] if result.get("total") else 0
+    elif exact_count:
+        # No search: the page is a bounded tenant_id index scan and the total
+        # a plain count, run concurrently instead of counting inside a $facet
+        vendor_rows, total_filtered = await asyncio.gather(
+            collection.aggregate(pipeline + page_stages).to_list(limit),
+            collection.count_documents(match)
+        )
+    else:
+        # Callers that only render "next": probe for one vendor past this page
+        vendor_rows, next_vendor = await asyncio.gather(
+            collection.aggregate(pipeline + page_stages).to_list(limit),
+            collection.find_one(match, {"_id": 1}, skip=skip + limit)
+        )
+        total_filtered = None
 
-    # 4. Build response items
+    # 3. Build response items (values come straight from MongoDB, so skip re-validation)
     items: List[VendorStatsResponse] = []
-    for v in paginated_vendors:
-        vid = str(v.id)
-        row = stats_by_vendor_id.get(vid, {})
+    for v in vendor_rows:
+        row = v["stats"][0] if v.get("stats") else {}
 
         items.append(
-            VendorStatsResponse(
-                id=vid,
-                readable_id=v.readable_id,
-                name=v.name,
-                status=v.status,
+            VendorStatsResponse.model_construct(
+                id=v["_sid"],
+                readable_id=v.get("readable_id"),
+                name=v["name"],
+                status=v.get("status", "enabled"),
                 leads=row.get("total_leads", 0),
                 duplicates=row.get("total_duplicates", 0),
                 leads_today=row.get("leads_today", 0),
@@ -284,14 +395,23 @@ async def list_vendor_stats(
             )
         )
 
-    # Note: Sorting by leads or alphabetical can be done on the filtered list or items
-    # Here we keep the insertion order from all_vendors (usually created_at descending if configured)
+    # Note: Vendors keep their natural (insertion) order, as before
     
-    return PaginatedVendorStatsResponse(
+    if total_filtered is None:
+        return PaginatedVendorStatsResponse.model_construct(
+            items=items,
+            total=None,
+            page=(skip // limit) + 1,
+            pages=None,
+            has_more=next_vendor is not None
+        )
+
+    return PaginatedVendorStatsResponse.model_construct(
         items=items,
         total=total_filtered,
         page=(skip // limit) + 1,
-        pages=(total_filtered + limit - 1) // limit if total_filtered > 0 else 0
+        pages=(total_filtered + limit - 1) // limit if total_filtered > 0 else 0,
+        has_more=skip + len(items) < total_filtered
     )
 
 @router.get("/{vendor_id}", response_model=VendorResponse)
@@ -307,7 +427,7 @@ async def get_vendor(
     return VendorResponse(id=str(vendor.id), readable_id=vendor.readable_id, name=vendor.name, status=vendor.status, sources=vendor.sources)
 
 @router.get("/{vendor_id}/sources/stats", response_model=PaginatedVendorSourceStatsResponse)
-
+@cache(ttl=30, tags=[source_stats_tag()], tenant_scoped=True)
 async def list_vendor_source_stats(
     request: Request,
     response: Response,
@@ -323,29 +443,45 @@ async def list_vendor_source_stats(
     Source table for a particular vendor with pagination and search.
     Computed from the Lead collection, optimized for performance.
     """
-    vendor = await find_vendor(vendor_id, current_user.tenant_id)
-
-    # 1. Filter sources based on search query
-    filtered_sources = vendor.sources
+    # 1-3. Filter, sort (newest first) and paginate the vendor's sources in MongoDB
+    source_pipeline: List[Dict[str, Any]] = [
+        {"$match": _vendor_match(vendor_id, current_user.tenant_id)},
+        {"$unwind": "$sources"},
+    ]
     if search:
-        q = search.lower()
-        filtered_sources = [
-            s for s in vendor.sources 
-            if q in s.name.lower() or q in s.id.lower() or (s.readable_id and q in s.readable_id.lower())
-        ]
+        pattern = {"$regex": re.escape(search), "$options": "i"}
+        source_pipeline.append({"$match": {"$or": [
+            {"sources.name": pattern},
+            {"sources.id": pattern},
+            {"sources.readable_id": pattern}
+        ]}})
+    source_pipeline.append({
+        "$facet": {
+            "items": [
+                {"$sort": {"sources.created_at": -1}},
+                {"$skip": skip},
+                {"$limit": limit},
+                {"$replaceWith": "$sources"},
+                {"$project": {
+                    "_id": 0, "id": 1, "readable_id": 1, "name": 1, "created_at": 1, "api_key": 1,
+                    "config.dupe_check": 1, "config.vendor_group": 1, "config.status": 1
+                }}
+            ],
+            "total": [{"$count": "n"}],
+            "vendor": [{"$limit": 1}, {"$project": {"_id": 0, "last_lead_at": 1}}]
+        }
+    })
+    facet = (await Vendor.get_pymongo_collection().aggregate(source_pipeline).to_list(1))[0]
+    paginated_sources = facet["items"]
+    total_filtered = facet["total"][0]["n"] if facet["total"] else 0
+    has_leads = bool(facet["vendor"] and facet["vendor"][0].get("last_lead_at"))
 
-    # 2. Sort sources (newest first)
-    filtered_sources.sort(key=lambda s: s.created_at if s.created_at else datetime.min, reverse=True)
-    
-    total_filtered = len(filtered_sources)
-    
-    # 3. Slice for pagination
-    paginated_sources = filtered_sources[skip : skip + limit]
-    
-    source_ids = [s.id for s in paginated_sources]
+    source_ids = [s["id"] for s in paginated_sources]
     
     if not source_ids:
-        return PaginatedVendorSourceStatsResponse(
+        if total_filtered == 0:
+            await find_vendor(vendor_id, current_user.tenant_id, projection=VendorIdView)  # 404s if the vendor is missing
+        return PaginatedVendorSourceStatsResponse.model_construct(
             items=[],
             total=total_filtered,
             page=(skip // limit) + 1,
@@ -353,100 +489,58 @@ async def list_vendor_source_stats(
         )
 
     # 4. Aggregation pipeline for lead stats (only for the paginated slice)
-    now = datetime.now()
-    start_today = datetime(now.year, now.month, now.day)
-    start_yesterday = start_today - timedelta(days=1)
+    age_stage, today_ms, yesterday_ms = _time_buckets(int(time.time() // 60))
 
     pipeline = [
         {
             "$match": {
-                "source_id": {"$in": source_ids},
-                "tenant_id": current_user.tenant_id
+                "tenant_id": current_user.tenant_id,
+                "source_id": {"$in": source_ids}
             }
         },
+        age_stage,
         {
             "$group": {
                 "_id": "$source_id",
-                "total_leads": {
-                    "$sum": {"$cond": [{"$eq": ["$status", "processed"]}, 1, 0]}
-                },
-                "total_duplicates": {
-                    "$sum": {
-                        "$cond": [
-                            {"$and": [
-                                {"$eq": ["$status", "rejected"]},
-                                {"$regexMatch": {"input": "$rejection_reason", "regex": "Duplicate"}}
-                            ]}, 
-                            1, 
-                            0
-                        ]
-                    }
-                },
-                "leads_today": {
-                    "$sum": {
-                        "$cond": [
-                            {"$and": [
-                                {"$eq": ["$status", "processed"]},
-                                {"$gte": ["$created_at", start_today]}
-                            ]},
-                            1,
-                            0
-                        ]
-                    }
-                },
-                "duplicates_today": {
-                    "$sum": {
-                        "$cond": [
-                            {"$and": [
-                                {"$eq": ["$status", "rejected"]},
-                                {"$regexMatch": {"input": "$rejection_reason", "regex": "Duplicate"}},
-                                {"$gte": ["$created_at", start_today]}
-                            ]}, 
-                            1, 
-                            0
-                        ]
-                    }
-                },
-                "leads_yesterday": {
-                    "$sum": {
-                        "$cond": [
-                            {"$and": [
-                                {"$eq": ["$status", "processed"]},
-                                {"$gte": ["$created_at", start_yesterday]},
-                                {"$lt": ["$created_at", start_today]}
-                            ]},
-                            1,
-                            0
-                        ]
-                    }
-                },
-                "last_week": {"$sum": {"$cond": [{"$and": [{"$eq": ["$status", "processed"]}, {"$gte": ["$created_at", now - timedelta(days=7)]}]}, 1, 0]}},
-                "last_month": {"$sum": {"$cond": [{"$and": [{"$eq": ["$status", "processed"]}, {"$gte": ["$created_at", now - timedelta(days=30)]}]}, 1, 0]}},
-                "last_year": {"$sum": {"$cond": [{"$and": [{"$eq": ["$status", "processed"]}, {"$gte": ["$created_at", now - timedelta(days=365)]}]}, 1, 0]}},
+                "total_leads": _count_if("$_processed"),
+                "total_duplicates": _count_if("$is_duplicate"),
+                "leads_today": _count_if("$_processed", {"$lte": ["$_age_ms", today_ms]}),
+                "duplicates_today": _count_if("$is_duplicate", {"$lte": ["$_age_ms", today_ms]}),
+                "leads_yesterday": _count_if(
+                    "$_processed",
+                    {"$gt": ["$_age_ms", today_ms]},
+                    {"$lte": ["$_age_ms", yesterday_ms]}
+                ),
+                "last_week": _count_if("$_processed", {"$lte": ["$_age_ms", 7 * DAY_MS]}),
+                "last_month": _count_if("$_processed", {"$lte": ["$_age_ms", 30 * DAY_MS]}),
+                "last_year": _count_if("$_processed", {"$lte": ["$_age_ms", 365 * DAY_MS]}),
             }
         }
     ]
 
-    from app.models.lead import Lead
-    stats_rows = await Lead.get_pymongo_collection().aggregate(pipeline).to_list(None)
-    stats_by_source_id = {row["_id"]: row for row in stats_rows}
+    # Vendors that never received a lead have nothing to aggregate
+    stats_by_source_id: Dict[str, dict] = {}
+    if has_leads:
+        async for row in Lead.get_pymongo_collection().aggregate(pipeline, batchSize=STATS_BATCH_SIZE):
+            stats_by_source_id[row["_id"]] = row
 
-    # 5. Build response items
+    # 5. Build response items (values come straight from MongoDB, so skip re-validation)
     items: List[VendorSourceStatsResponse] = []
     for source in paginated_sources:
-        row = stats_by_source_id.get(source.id, {})
+        row = stats_by_source_id.get(source["id"], {})
+        config = source.get("config", {})
         
-        dupe_check_status = "Enabled" if getattr(source.config, "dupe_check", False) else "Disabled"
-        create_date = source.created_at.isoformat() if source.created_at else ""
-        source_group = getattr(source.config, "vendor_group", None)
+        dupe_check_status = "Enabled" if config.get("dupe_check", False) else "Disabled"
+        create_date = source["created_at"].isoformat() if source.get("created_at") else ""
+        source_group = config.get("vendor_group")
 
         items.append(
-            VendorSourceStatsResponse(
-                source_id=source.id,
-                readable_id=source.readable_id,
-                source_name=source.name,
+            VendorSourceStatsResponse.model_construct(
+                source_id=source["id"],
+                readable_id=source.get("readable_id"),
+                source_name=source["name"],
                 create_date=create_date,
-                auth_key=source.api_key,
+                auth_key=source.get("api_key", ""),
                 source_group=source_group,
                 dupe_check=dupe_check_status,
                 leads=row.get("total_leads", 0),
@@ -458,11 +552,11 @@ async def list_vendor_source_stats(
                 last_month=row.get("last_month", 0),
                 last_year=row.get("last_year", 0),
                 all_time=row.get("total_leads", 0),
-                status=source.config.status,
+                status=config.get("status", "enabled"),
             )
         )
 
-    return PaginatedVendorSourceStatsResponse(
+    return PaginatedVendorSourceStatsResponse.model_construct(
         items=items,
         total=total_filtered,
         page=(skip // limit) + 1,
@@ -475,8 +569,7 @@ async def create_source(
     payload: SourceCreate,
     current_user: User = Depends(deps.require_permission(Permission.CREATE_SOURCES))
 ):
-    from app.models.vendor import generate_readable_id
-    vendor = await find_vendor(vendor_id, current_user.tenant_id)
+    vendor = await find_vendor(vendor_id, current_user.tenant_id, projection=VendorIdView)
     
     new_source = Source(name=payload.name, type=payload.type, readable_id=generate_readable_id("SRC"))
     if payload.config is not None:
@@ -488,10 +581,13 @@ async def create_source(
     if payload.rules is not None:
         new_source.rules = new_source.rules.model_validate(payload.rules)
 
-    vendor.sources.append(new_source)
-    await vendor.save()
+    await Vendor.get_pymongo_collection().update_one(
+        {"_id": vendor.id, "tenant_id": current_user.tenant_id},
+        {"$push": {"sources": new_source.model_dump()}}
+    )
     
     # Comprehensive cache invalidation - ensure new source appears immediately
+    await invalidate_stats_cache(current_user.tenant_id)
 
     # Sync Mappings
     if payload.mapping and payload.mapping.get("rules"):
@@ -511,7 +607,6 @@ async def get_source(
 
     
     # Direct lookup for speed and efficiency
-    from beanie import PydanticObjectId
     try:
         vid_oid = PydanticObjectId(vendor_id)
         # Use aggregation to find the vendor and extract ONLY the matching source
@@ -549,32 +644,42 @@ async def update_source(
     payload: SourceUpdate,
     current_user: User = Depends(deps.require_permission(Permission.EDIT_SOURCES))
 ):
-    vendor = await find_vendor(vendor_id, current_user.tenant_id)
-
-    idx = next((i for i, s in enumerate(vendor.sources) if s.id == source_id), None)
-    if idx is None:
-        raise HTTPException(status_code=404, detail="Source not found")
-
-    source = vendor.sources[idx]
-    if payload.name is not None:
-        source.name = payload.name
-    if payload.type is not None:
-        source.type = payload.type
-    if payload.api_key is not None:
-        source.api_key = payload.api_key
+    # Only the changed fields of the one source are sent to the server
+    updates: Dict[str, Any] = {
+        field: value
+        for field, value in (("name", payload.name), ("type", payload.type), ("api_key", payload.api_key))
+        if value is not None
+    }
     if payload.config is not None:
-        source.config = source.config.model_validate(payload.config)
+        updates["config"] = SourceConfig.model_validate(payload.config).model_dump()
     if payload.validation is not None:
-        source.validation = source.validation.model_validate(payload.validation)
+        updates["validation"] = SourceValidationConfig.model_validate(payload.validation).model_dump()
     if payload.mapping is not None:
-        source.mapping = source.mapping.model_validate(payload.mapping)
+        updates["mapping"] = SourceMapping.model_validate(payload.mapping).model_dump()
     if payload.rules is not None:
-        source.rules = source.rules.model_validate(payload.rules)
+        updates["rules"] = SourceRules.model_validate(payload.rules).model_dump()
+
+    match = {**_vendor_match(vendor_id, current_user.tenant_id), "sources.id": source_id}
+    collection = Vendor.get_pymongo_collection()
+    projection = {"sources": {"$elemMatch": {"id": source_id}}}
+    if updates:
+        doc = await collection.find_one_and_update(
+            match,
+            {"$set": {f"sources.$[s].{field}": value for field, value in updates.items()}},
+            array_filters=[{"s.id": source_id}],
+            projection=projection,
+            return_document=ReturnDocument.AFTER
+        )
+    else:
+        doc = await collection.find_one(match, projection)
+    if not doc:
+        await find_vendor(vendor_id, current_user.tenant_id, projection=VendorIdView)  # 404s if the vendor is missing
+        raise HTTPException(status_code=404, detail="Source not found")
 
-    vendor.sources[idx] = source
-    await vendor.save()
+    source = Source.model_validate(doc["sources"][0])
 
     # Comprehensive cache invalidation - ensure updates appear immediately
+    await invalidate_stats_cache(current_user.tenant_id)
 
     # Sync Mappings
     if payload.mapping and payload.mapping.get("rules"):
@@ -591,31 +696,28 @@ async def update_vendor_status(
     if status not in ["enabled", "disabled"]:
         raise HTTPException(status_code=400, detail="Invalid status")
     
-    vendor = await find_vendor(vendor_id, current_user.tenant_id)
-    
-    vendor.status = status
-    
-    # Logic: if vendor is disabled, disable all its sources
-    if status == "disabled":
-        for source in vendor.sources:
-            source.config.status = "disabled"
-            
-    elif status == "enabled":
-        for source in vendor.sources:
-            source.config.status = "enabled"
-            
-    await vendor.save()
+    # Sources follow the vendor status (disabling a vendor disables all its sources)
+    doc = await Vendor.get_pymongo_collection().find_one_and_update(
+        _vendor_match(vendor_id, current_user.tenant_id),
+        {"$set": {"status": status, "sources.$[].config.status": status}},
+        return_document=ReturnDocument.AFTER
+    )
+    if not doc:
+        raise HTTPException(status_code=404, detail="Vendor not found")
+
     # Invalidate Vendor cache
-    return VendorResponse(id=str(vendor.id), readable_id=vendor.readable_id, name=vendor.name, status=vendor.status, sources=vendor.sources)
+    await invalidate_stats_cache(current_user.tenant_id)
+    return VendorResponse(id=str(doc["_id"]), readable_id=doc.get("readable_id"), name=doc["name"], status=doc["status"], sources=doc.get("sources", []))
 
 @router.delete("/{vendor_id}")
 async def delete_vendor(
     vendor_id: str,
     current_user: User = Depends(deps.require_permission(Permission.DELETE_VENDORS))
 ):
-    vendor = await find_vendor(vendor_id, current_user.tenant_id)
-    await vendor.delete()
+    vendor = await find_vendor(vendor_id, current_user.tenant_id, projection=VendorIdView)
+    await Vendor.find_one(Vendor.id == vendor.id).delete()
     # Invalidate Vendor cache
+    await invalidate_stats_cache(current_user.tenant_id)
     return {"message": "Vendor deleted successfully"}
 
 @router.delete("/{vendor_id}/sources/{source_id}")
@@ -624,16 +726,16 @@ async def delete_source(
     source_id: str,
     current_user: User = Depends(deps.require_permission(Permission.DELETE_SOURCES))
 ):
-    vendor = await find_vendor(vendor_id, current_user.tenant_id)
-    
-    idx = next((i for i, s in enumerate(vendor.sources) if s.id == source_id), None)
-    if idx is None:
+    result = await Vendor.get_pymongo_collection().update_one(
+        {**_vendor_match(vendor_id, current_user.tenant_id), "sources.id": source_id},
+        {"$pull": {"sources": {"id": source_id}}}
+    )
+    if result.matched_count == 0:
+        await find_vendor(vendor_id, current_user.tenant_id, projection=VendorIdView)  # 404s if the vendor is missing
         raise HTTPException(status_code=404, detail="Source not found")
     
-    vendor.sources.pop(idx)
-    await vendor.save()
-    
     # Comprehensive cache invalidation - ensure deletion appears immediately
+    await invalidate_stats_cache(current_user.tenant_id)
     return {"message": "Source deleted successfully"}
 
 @router.get("/{vendor_id}/leads")
@@ -645,27 +747,18 @@ async def get_vendor_leads(
     current_user: User = Depends(deps.require_permission(Permission.VIEW_LEADS))
 ):
     # Verify vendor ownership
-    vendor = await find_vendor(vendor_id, current_user.tenant_id)
+    vendor = await find_vendor(vendor_id, current_user.tenant_id, projection=VendorIdView)
     vendor_oid = str(vendor.id)
 
-    from app.models.lead import Lead
-    from beanie.operators import RegEx, Or
-    
     query = [Lead.vendor_id == vendor_oid, Lead.tenant_id == current_user.tenant_id]
-    
     if search:
-        escaped_search = re.escape(search)
-        query.append(Or(
-            RegEx(Lead.status, escaped_search, "i"),
-            RegEx("data.email", escaped_search, "i"),
-            RegEx("data.phone", escaped_search, "i"),
-            RegEx("data.first_name", escaped_search, "i"),
-            RegEx("data.last_name", escaped_search, "i"),
-        ))
+        query.append(_lead_search_filter(search))
     
-    # Execute count and find
-    total_count = await Lead.find(*query).count()
-    leads = await Lead.find(*query).sort(-Lead.created_at).skip(skip).limit(limit).to_list()
+    # Count and page are independent; run them concurrently
+    total_count, leads = await asyncio.gather(
+        Lead.find(*query).count(),
+        Lead.find(*query).sort(-Lead.created_at).skip(skip).limit(limit).to_list()
+    )
     
     return {
         "items": leads,
@@ -674,31 +767,13 @@ async def get_vendor_leads(
         "pages": (total_count + limit - 1) // limit
     }
 
-@router.get("/{vendor_id}/history")
-async def get_vendor_stats_history(
-    vendor_id: str,
-    start_date: str,
-    end_date: str,
-    current_user: User = Depends(deps.require_permission(Permission.VIEW_VENDORS))
-):
-    """
-    Returns daily stats (leads, duplicates) for a vendor within a date range.
-    """
-    # Verify vendor ownership
-    vendor = await find_vendor(vendor_id, current_user.tenant_id)
-    vendor_oid = str(vendor.id)
-
-    try:
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        end = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1) # Include end date fully
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
-        
+async def _aggregate_vendor_days(tenant_id: str, vendor_oid: str, start: datetime, end: datetime) -> Dict[str, Dict[str, Any]]:
+    """Live per-day lead/duplicate counts for a vendor over [start, end)."""
     pipeline = [
         {
             "$match": {
+                "tenant_id": tenant_id,
                 "vendor_id": vendor_oid,
-                "tenant_id": current_user.tenant_id,
                 "created_at": {"$gte": start, "$lt": end}
             }
         },
@@ -713,27 +788,73 @@ async def get_vendor_stats_history(
                 "duplicates": {
                     "$sum": {
                         "$cond": [
-                            {"$and": [
-                                {"$eq": ["$status", "rejected"]},
-                                {"$regexMatch": {"input": "$rejection_reason", "regex": "Duplicate"}}
-                            ]}, 
-                            1, 
+                            {"$eq": ["$is_duplicate", True]},
+                            1,
                             0
                         ]
                     }
                 }
             }
-        },
-        {"$sort": {"_id": 1}}
+        }
     ]
 
-    from app.models.lead import Lead
-    rows = await Lead.get_pymongo_collection().aggregate(pipeline).to_list(None)
+    return {
+        row["_id"]: row
+        async for row in Lead.get_pymongo_collection().aggregate(pipeline, batchSize=STATS_BATCH_SIZE)
+    }
+
+@router.get("/{vendor_id}/history")
+async def get_vendor_stats_history(
+    vendor_id: str,
+    start_date: str,
+    end_date: str,
+    current_user: User = Depends(deps.require_permission(Permission.VIEW_VENDORS))
+):
+    """
+    Returns daily stats (leads, duplicates) for a vendor within a date range.
+    """
+    # Verify vendor ownership
+    vendor = await find_vendor(vendor_id, current_user.tenant_id, projection=VendorIdView)
+    vendor_oid = str(vendor.id)
+
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d")
+        end = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1) # Include end date fully
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+        
+    # Completed days come from the daily rollup; the live tail (yesterday +
+    # today, which the hourly rollup may not cover yet) is aggregated.
+    now = datetime.utcnow()
+    live_start = max(start, datetime(now.year, now.month, now.day) - timedelta(days=1))
+
+    data_map = {}
+    if start < live_start:
+        rollups = await LeadDailyStats.find(
+            LeadDailyStats.tenant_id == current_user.tenant_id,
+            LeadDailyStats.vendor_id == vendor_oid,
+            LeadDailyStats.date >= start.strftime("%Y-%m-%d"),
+            LeadDailyStats.date < min(end, live_start).strftime("%Y-%m-%d")
+        ).to_list()
+        data_map = {r.date: {"leads": r.leads, "duplicates": r.duplicates} for r in rollups}
+
+        # A day without a rollup row was either not rolled up yet (beat not
+        # running, pre-rollup history) or had no leads: aggregate live from the
+        # first such day. Only busy vendors are expensive to aggregate, and
+        # those have a row for every rolled-up day.
+        day = start
+        while day < live_start and day.strftime("%Y-%m-%d") in data_map:
+            day += timedelta(days=1)
+        live_start = day
+
+    if live_start < end:
+        live_rows = await _aggregate_vendor_days(current_user.tenant_id, vendor_oid, live_start, end)
+        for day_str, row in live_rows.items():
+            data_map.setdefault(day_str, row)  # Rolled-up rows take precedence
     
     # Fill in missing dates with 0
     result = []
     current = start
-    data_map = {r["_id"]: r for r in rows}
     
     while current < end:
         day_str = current.strftime("%Y-%m-%d")
@@ -1,24 +1,58 @@
+import json
+import orjson
 from celery import Celery
+from kombu.serialization import register
 from app.core.config import settings
 
+def _orjson_dumps(obj) -> bytes:
+    # orjson rejects integers beyond 64 bits and non-str dict keys, which stdlib
+    # json accepts: fall back instead of failing the enqueue. (orjson decodes
+    # such integers as floats; tasks carrying raw lead payloads use "json".)
+    try:
+        return orjson.dumps(obj)
+    except TypeError:
+        return json.dumps(obj).encode()
+
+# orjson encodes/decodes task arguments several times faster than stdlib json and
+# emits compact output. Plain "json" stays accepted for messages already queued.
+register(
+    "orjson",
+    _orjson_dumps,
+    orjson.loads,
+    content_type="application/x-orjson",
+    content_encoding="utf-8",
+)
+
 celery_app = Celery(
     "worker",
     broker=settings.REDIS_CELERY_URL,  # Use dedicated Celery Redis
     backend=settings.REDIS_CELERY_URL
 )
 
-# Task routing - disabled for development (Windows solo pool compatibility)
-# For production, uncomment and start workers with: celery -A app.worker worker -Q queue_name
-# celery_app.conf.task_routes = {
-#     'app.tasks.email_tasks.*': {'queue': 'emails'},
-#     'app.tasks.lead_tasks.process_lead': {'queue': 'leads'},
-#     'app.tasks.lead_tasks.*': {'queue': 'default'},
-# }
+# Task routing - off by default for development (Windows solo pool consumes only
+# the default queue). In production set CELERY_TASK_ROUTING=true on both the API and
+# the workers, and run one worker per queue so slow lead deliveries can't starve emails:
+#   celery -A app.worker worker -Q emails -c 8 -Ofair --prefetch-multiplier=1
+#   celery -A app.worker worker -Q leads -c 16 -Ofair --prefetch-multiplier=1
+# With -Ofair and prefetch 1 a child only reserves a task once it is free, so one
+# slow lead does not hold up the tasks queued behind it.
+if settings.CELERY_TASK_ROUTING:
+    celery_app.conf.task_routes = {
+        'app.tasks.email_tasks.*': {'queue': 'emails'},
+        'app.tasks.lead_tasks.*': {'queue': 'leads'},
+    }
+
+# Per-worker rate limits for tasks that hit external services
+celery_app.conf.task_annotations = {
+    'app.tasks.lead_tasks.route_lead_task': {'rate_limit': '100/s'},  # HTTP deliveries to buyers
+    'app.tasks.email_tasks.send_email_task': {'rate_limit': '30/s'},  # SMTP
+    'app.tasks.email_tasks.send_raw_email_task': {'rate_limit': '30/s'},
+}
 
 celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    task_serializer="orjson",
+    accept_content=["orjson", "json"],
+    result_serializer="orjson",
     timezone="UTC",
     enable_utc=True,
     
@@ -38,7 +72,9 @@ celery_app.conf.update(
     task_time_limit=600,  # 10 minutes hard limit
     
     # Worker settings
-    worker_prefetch_multiplier=4,  # Prefetch 4 tasks per worker
+    worker_prefetch_multiplier=settings.CELERY_PREFETCH_MULTIPLIER,  # Low for I/O-bound tasks
+    worker_enable_prefetch_count_reduction=True,  # Shrink prefetch while tasks are slow to ack
+    worker_concurrency=settings.CELERY_WORKER_CONCURRENCY,
     worker_max_tasks_per_child=1000,  # Restart worker after 1000 tasks
     
     # Monitoring
@@ -52,8 +88,23 @@ celery_app.conf.update(
             "schedule": 86400.0, # Run every 24 hours (seconds)
             # "schedule": crontab(hour=0, minute=0), # Better alternative if crontab usage allowed, using seconds for simplicity/windows compat
         },
+        "rollup-lead-daily-stats-hourly": {
+            "task": "app.tasks.lead_tasks.rollup_lead_daily_stats_task",
+            "schedule": 3600.0, # Hourly; each run re-rolls the last 2 complete days (idempotent upsert)
+        },
     }
 )
 
+def bulk_send(signatures):
+    """
+    Enqueue many task signatures over one pooled broker connection/producer,
+    instead of acquiring a connection per `task.delay()` call.
+    """
+    if not signatures:
+        return
+    with celery_app.producer_or_acquire() as producer:
+        for signature in signatures:
+            signature.apply_async(producer=producer)
+
 # Autodiscover tasks in the tasks directory
 celery_app.autodiscover_tasks(["app.tasks.lead_tasks", "app.tasks.email_tasks"])
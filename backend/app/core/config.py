@@ -1,9 +1,14 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Vellkopoint"
     API_V1_STR: str = "/api/v1"
     MONGODB_URI: str
+    MONGODB_MAX_POOL_SIZE: int = 200
+    MONGODB_MIN_POOL_SIZE: int = 10  # Per process (API workers and Celery children each hold a pool)
+    # Skip Beanie's index checks on startup (set once indexes are built, e.g. in production)
+    MONGODB_SKIP_INDEX_CREATION: bool = False
     
     # Redis - Separated by purpose for production
     REDIS_CACHE_URL: str
@@ -15,6 +20,13 @@ class Settings(BaseSettings):
     CELERY_BROKER_URL: str = ""
     CELERY_RESULT_BACKEND: str = ""
     
+    # Celery workers - tasks are I/O-bound (HTTP delivery, SMTP, Mongo/Redis),
+    # so keep prefetch low to avoid reserving tasks behind slow ones
+    CELERY_PREFETCH_MULTIPLIER: int = 2
+    CELERY_WORKER_CONCURRENCY: int | None = None  # None = one process per CPU
+    # Route emails/leads to dedicated queues (workers must then be started with -Q)
+    CELERY_TASK_ROUTING: bool = False
+    
     FRONTEND_URL: str
     BACKEND_URL: str
     PUBLIC_FRONTEND_URL: str | None = None
@@ -37,6 +49,7 @@ class Settings(BaseSettings):
     SMTP_PORT: int = 587
     SMTP_USER: str
     SMTP_PASSWORD: str
+    SMTP_POOL_SIZE: int = 5  # Persistent SMTP connections per process
     EMAILS_FROM_EMAIL: str = "noreply@vellkopoint.com"
     EMAILS_FROM_NAME: str = "Vellkopoint"
     
@@ -58,6 +71,7 @@ class Settings(BaseSettings):
     class Config:
         case_sensitive = True
         env_file = ".env"
+        frozen = True  # Read-only after load
 
     @property
     def get_public_frontend_url(self) -> str:
@@ -67,4 +81,9 @@ class Settings(BaseSettings):
     def get_public_backend_url(self) -> str:
         return self.PUBLIC_BACKEND_URL or self.BACKEND_URL
 
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Load settings (env + .env) once per process."""
+    return Settings()
+
+settings = get_settings()
\ No newline at end of file
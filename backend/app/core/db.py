@@ -5,6 +5,7 @@ from app.models.vendor import Vendor
 from app.models.customer import Customer
 from app.models.analytics import AnalyticsEvent
 from app.models.lead import Lead
+from app.models.lead_daily_stats import LeadDailyStats
 from app.models.system_field import SystemField
 from app.models.unknown_field import UnknownField
 from app.models.user import User
@@ -13,15 +14,33 @@ from app.models.campaign import Campaign
 from app.models.destination import Destination
 from app.models.role import Role
 
+# Process-wide client: Beanie and raw collection access share one connection pool
+_client: AsyncIOMotorClient | None = None
+
+def get_mongo_client() -> AsyncIOMotorClient:
+    """Return the shared MongoDB client (init_db must have run)."""
+    if _client is None:
+        raise RuntimeError("MongoDB client not initialized; call init_db() first")
+    return _client
+
 async def init_db():
-    client = AsyncIOMotorClient(settings.MONGODB_URI)
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(
+            settings.MONGODB_URI,
+            maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+            compressors="zstd,zlib",  # Large original_payload documents compress well
+            retryWrites=True
+        )
     await init_beanie(
-        database=client.get_default_database(),
+        database=_client.get_default_database(),
         document_models=[
             Vendor,
             Customer,
             AnalyticsEvent,
             Lead,
+            LeadDailyStats,
             SystemField,
             UnknownField,
             User,
@@ -29,5 +48,14 @@ async def init_db():
             Campaign,
             Destination,
             Role
-        ]
+        ],
+        allow_index_dropping=False,
+        skip_indexes=settings.MONGODB_SKIP_INDEX_CREATION
     )
+
+def close_db():
+    """Close the shared MongoDB client (application shutdown)."""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
@@ -0,0 +1,43 @@
+import httpx
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Outbound delivery pool: kept alive across deliveries so repeat posts to the
+# same buyer endpoint skip the TCP/TLS handshake
+MAX_CONNECTIONS = 500
+MAX_KEEPALIVE_CONNECTIONS = 200
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Shared AsyncClient for outbound deliveries, created lazily on first use in
+    each process (API or Celery worker child). Callers pass per-request
+    timeouts; the client itself has none.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS
+            ),
+            timeout=None,
+            # Deliveries for different tenants share this client: never persist
+            # Set-Cookie from one delivery into the next
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+        )
+    return _client
+
+
+async def close_http_client():
+    """Close the shared client's pooled connections (app shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("🔌 Outbound HTTP client closed")
@@ -0,0 +1,52 @@
+import logging
+import time
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Requests slower than this are logged as warnings
+SLOW_REQUEST_US = 1_000_000  # 1 second
+
+
+class PerformanceMiddleware:
+    """
+    Pure ASGI middleware adding X-Process-Time (and rate limit headers set by
+    the rate limiter on request.state) to every HTTP response.
+
+    Unlike @app.middleware("http") (BaseHTTPMiddleware), it does not spawn a
+    task or stream the response body through a memory channel; it only
+    rewrites the headers of the http.response.start message.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_ns = time.perf_counter_ns()  # monotonic, unlike time.time()
+        elapsed_us = 0
+
+        async def send_with_headers(message: Message):
+            nonlocal elapsed_us
+            if message["type"] == "http.response.start":
+                elapsed_us = (time.perf_counter_ns() - start_ns) // 1000
+                headers = MutableHeaders(scope=message)
+                headers["X-Process-Time"] = f"{elapsed_us / 1000:.2f}ms"
+
+                # Add rate limit headers if available (request.state lives in scope["state"])
+                info = scope.get("state", {}).get("rate_limit_info")
+                if info:
+                    headers["X-RateLimit-Limit"] = str(info.get("limit", ""))
+                    headers["X-RateLimit-Remaining"] = str(info.get("remaining", ""))
+                    headers["X-RateLimit-Reset"] = str(info.get("reset", ""))
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+        # Log slow requests
+        if elapsed_us > SLOW_REQUEST_US and logger.isEnabledFor(logging.WARNING):
+            logger.warning(f"⚠️ Slow request: {scope['method']} {scope['path']} took {elapsed_us / 1000:.2f}ms")
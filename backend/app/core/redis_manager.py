@@ -1,3 +1,4 @@
+import asyncio
 import redis.asyncio as redis
 from typing import Optional
 import logging
@@ -5,26 +6,52 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for a free pooled connection before raising
+POOL_TIMEOUT = 2
+
 class RedisManager:
-    """Manages multiple Redis connections for different purposes"""
+    """
+    Manages multiple Redis connections for different purposes.
+    
+    The cache client returns raw bytes (decode_responses=False): cached
+    responses are msgpack blobs (see app.utils.cache), and counters/JSON
+    values parse from bytes directly. Celery and session clients decode to str.
+    """
     
     def __init__(self):
         self._cache_client: Optional[redis.Redis] = None
         self._celery_client: Optional[redis.Redis] = None
         self._session_client: Optional[redis.Redis] = None
         
-    async def get_cache_redis(self) -> redis.Redis:
-        """Get Redis client for application cache"""
+    @staticmethod
+    def _create_client(url: str, max_connections: int, client_name: str, decode_responses: bool = True) -> redis.Redis:
+        """
+        Client backed by a BlockingConnectionPool: when the pool is exhausted,
+        callers wait up to POOL_TIMEOUT seconds for a connection instead of
+        failing immediately. The hiredis parser is picked up automatically
+        when installed.
+        """
+        pool = redis.BlockingConnectionPool.from_url(
+            url,
+            max_connections=max_connections,
+            timeout=POOL_TIMEOUT,
+            encoding="utf-8",
+            decode_responses=decode_responses,
+            socket_connect_timeout=5,
+            socket_keepalive=True,
+            retry_on_timeout=True,
+            health_check_interval=30,  # Re-check idle sockets before reuse
+            client_name=client_name  # Shows up in CLIENT LIST
+        )
+        return redis.Redis.from_pool(pool)
+
+    async def init_all(self):
+        """
+        Create all Redis clients once per process (app lifespan startup, Celery
+        task bootstrap), so the getters below are plain attribute reads.
+        """
         if self._cache_client is None:
-            self._cache_client = await redis.from_url(
-                settings.REDIS_CACHE_URL,
-                encoding="utf-8",
-                decode_responses=True,
-                max_connections=50,
-                socket_connect_timeout=5,
-                socket_keepalive=True,
-                retry_on_timeout=True
-            )
+            self._cache_client = await self._create_client(settings.REDIS_CACHE_URL, max_connections=50, client_name="vellkopoint-cache", decode_responses=False)
             logger.info(f"✅ Cache Redis connected: {settings.REDIS_CACHE_URL}")
             
             # Configure maxmemory and eviction policy
@@ -34,76 +61,66 @@ class RedisManager:
                 logger.info(f"📊 Cache Redis configured: maxmemory={settings.CACHE_MAX_MEMORY}, policy={settings.CACHE_EVICTION_POLICY}")
             except Exception as e:
                 logger.warning(f"⚠️ Could not set Redis config (may require admin): {e}")
-                
-        return self._cache_client
-    
-    async def get_celery_redis(self) -> redis.Redis:
-        """Get Redis client for Celery broker/results"""
+        
         if self._celery_client is None:
-            self._celery_client = await redis.from_url(
-                settings.REDIS_CELERY_URL,
-                encoding="utf-8",
-                decode_responses=True,
-                max_connections=20,
-                socket_connect_timeout=5,
-                socket_keepalive=True,
-                retry_on_timeout=True
-            )
+            self._celery_client = await self._create_client(settings.REDIS_CELERY_URL, max_connections=20, client_name="vellkopoint-celery")
             logger.info(f"✅ Celery Redis connected: {settings.REDIS_CELERY_URL}")
-        return self._celery_client
-    
-    async def get_session_redis(self) -> redis.Redis:
-        """Get Redis client for user sessions"""
+        
         if self._session_client is None:
-            self._session_client = await redis.from_url(
-                settings.REDIS_SESSION_URL,
-                encoding="utf-8",
-                decode_responses=True,
-                max_connections=30,
-                socket_connect_timeout=5,
-                socket_keepalive=True,
-                retry_on_timeout=True
-            )
+            self._session_client = await self._create_client(settings.REDIS_SESSION_URL, max_connections=30, client_name="vellkopoint-session")
             logger.info(f"✅ Session Redis connected: {settings.REDIS_SESSION_URL}")
-        return self._session_client
+    
+    @staticmethod
+    def _require(client: Optional[redis.Redis]) -> redis.Redis:
+        if client is None:
+            raise RuntimeError("Redis clients not initialized; call redis_manager.init_all() first")
+        return client
+    
+    def get_cache_redis(self) -> redis.Redis:
+        """Get Redis client for application cache"""
+        return self._require(self._cache_client)
+    
+    def get_celery_redis(self) -> redis.Redis:
+        """Get Redis client for Celery broker/results"""
+        return self._require(self._celery_client)
+    
+    def get_session_redis(self) -> redis.Redis:
+        """Get Redis client for user sessions"""
+        return self._require(self._session_client)
     
     async def health_check(self) -> dict:
         """Check health of all Redis connections"""
-        health = {
-            "cache": False,
-            "celery": False,
-            "session": False
+        # Ping all three concurrently: latency is the slowest ping, not the sum
+        clients = {
+            "cache": ("Cache", self.get_cache_redis),
+            "celery": ("Celery", self.get_celery_redis),
+            "session": ("Session", self.get_session_redis),
         }
-        
-        try:
-            cache = await self.get_cache_redis()
-            await cache.ping()
-            health["cache"] = True
-        except Exception as e:
-            logger.error(f"❌ Cache Redis health check failed: {e}")
-        
-        try:
-            celery = await self.get_celery_redis()
-            await celery.ping()
-            health["celery"] = True
-        except Exception as e:
-            logger.error(f"❌ Celery Redis health check failed: {e}")
-        
-        try:
-            session = await self.get_session_redis()
-            await session.ping()
-            health["session"] = True
-        except Exception as e:
-            logger.error(f"❌ Session Redis health check failed: {e}")
+
+        async def ping(get_client) -> bool:
+            return await get_client().ping()
+
+        results = await asyncio.gather(
+            *(ping(get_client) for _, get_client in clients.values()),
+            return_exceptions=True
+        )
+
+        health = {}
+        for (name, (label, _)), result in zip(clients.items(), results):
+            health[name] = result is True
+            if isinstance(result, Exception):
+                logger.error(f"❌ {label} Redis health check failed: {result}")
         
         return health
     
     async def get_cache_stats(self) -> dict:
         """Get cache statistics"""
         try:
-            cache = await self.get_cache_redis()
-            info = await cache.info("stats")
-            memory = await cache.info("memory")
+            cache = self.get_cache_redis()
+            async with cache.pipeline(transaction=False) as pipe:
+                pipe.info("stats")
+                pipe.info("memory")
+                info, memory = await pipe.execute()
             
             return {
                 "keyspace_hits": info.get("keyspace_hits", 0),
@@ -144,14 +161,14 @@ class RedisManager:
 redis_manager = RedisManager()
 
 # Convenience functions
-async def get_cache_redis() -> redis.Redis:
+def get_cache_redis() -> redis.Redis:
     """Get cache Redis client"""
-    return await redis_manager.get_cache_redis()
+    return redis_manager.get_cache_redis()
 
-async def get_celery_redis() -> redis.Redis:
+def get_celery_redis() -> redis.Redis:
     """Get Celery Redis client"""
-    return await redis_manager.get_celery_redis()
+    return redis_manager.get_celery_redis()
 
-async def get_session_redis() -> redis.Redis:
+def get_session_redis() -> redis.Redis:
     """Get session Redis client"""
-    return await redis_manager.get_session_redis()
+    return redis_manager.get_session_redis()
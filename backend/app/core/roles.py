@@ -2,7 +2,8 @@
 Role definitions and role-permission mappings for RBAC system.
 """
 
-from typing import List
+from types import MappingProxyType
+from typing import Collection, FrozenSet, Iterable, List, Mapping, Optional
 from app.core.permissions import Permission, ALL_PERMISSIONS
 
 
@@ -14,14 +15,15 @@ class Role:
     USER = "user"
 
 
-# Role-Permission Mappings
-ROLE_PERMISSIONS = {
+# Role-Permission Mappings (read-only mapping of frozensets: membership checks
+# run on every request, and callers share these sets without copying)
+ROLE_PERMISSIONS: Mapping[str, FrozenSet[str]] = MappingProxyType({
     # Super Admin/Owner: Full access to tenant data
-    Role.SUPER_ADMIN: ALL_PERMISSIONS,
-    Role.OWNER: ALL_PERMISSIONS,
+    Role.SUPER_ADMIN: frozenset(ALL_PERMISSIONS),
+    Role.OWNER: frozenset(ALL_PERMISSIONS),
     
     # Admin: High access, can manage users/destinations
-    Role.ADMIN: [
+    Role.ADMIN: frozenset([
         # Vendors & Sources - Full access
         Permission.VIEW_VENDORS,
         Permission.CREATE_VENDORS,
@@ -72,10 +74,10 @@ ROLE_PERMISSIONS = {
         
         # Settings
         Permission.MANAGE_SETTINGS,
-    ],
+    ]),
     
     # User: Limited access
-    Role.USER: [
+    Role.USER: frozenset([
         Permission.VIEW_VENDORS,
         Permission.VIEW_SOURCES,
         Permission.VIEW_LEADS,  # Masked only
@@ -85,23 +87,33 @@ ROLE_PERMISSIONS = {
         Permission.VIEW_CAMPAIGNS,
         Permission.VIEW_SYSTEM_FIELDS,
         Permission.VIEW_ANALYTICS,
-    ],
-}
+    ]),
+})
 
+ADMIN_ROLES = frozenset([Role.SUPER_ADMIN, Role.OWNER, Role.ADMIN])
 
-def get_role_permissions(role: str) -> List[str]:
-    """Get list of permissions for a given role."""
-    return ROLE_PERMISSIONS.get(role, [])
 
+def get_role_permissions(role: str) -> FrozenSet[str]:
+    """Get the set of permissions for a given role."""
+    return ROLE_PERMISSIONS.get(role, frozenset())
 
-def has_permission(user_role: str, user_permissions: List[str], required_permission: str) -> bool:
-    """Check if a user has a specific permission."""
+
+def merge_role_permissions(role: str, custom_permissions: Optional[Iterable[str]] = None) -> List[str]:
+    """Merge the base role's permissions with a custom role's permissions."""
+    all_perms = set(get_role_permissions(role))
+    if custom_permissions:
+        all_perms.update(custom_permissions)
+    return list(all_perms)
+
+
+def has_permission(user_role: str, user_permissions: Collection[str], required_permission: str) -> bool:
+    """Check if a user has a specific permission (O(1) when given a frozenset)."""
     return required_permission in user_permissions
 
 
 def is_admin(user_role: str) -> bool:
     """Check if user is an admin or owner"""
-    return user_role in [Role.SUPER_ADMIN, Role.OWNER, Role.ADMIN]
+    return user_role in ADMIN_ROLES
 
 
 def is_owner(user_role: str) -> bool:
@@ -109,7 +121,7 @@ def is_owner(user_role: str) -> bool:
     return user_role == Role.OWNER
 
 
-def can_view_full_data(user_role: str, user_permissions: List[str]) -> bool:
+def can_view_full_data(user_role: str, user_permissions: Collection[str]) -> bool:
     """
     Check if user can view unmasked/full lead data.
     
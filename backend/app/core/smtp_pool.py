@@ -0,0 +1,128 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from email.message import EmailMessage
+from typing import AsyncIterator, Optional
+import aiosmtplib
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Recycle a connection after this many messages (many relays throttle or drop
+# long-lived sessions)
+MAX_MESSAGES_PER_CONNECTION = 100
+# Idle connections older than this are probed with NOOP before reuse
+IDLE_CHECK_SECONDS = 60
+
+
+class _PooledConnection:
+    def __init__(self, client: aiosmtplib.SMTP):
+        self.client = client
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPPool:
+    """
+    Fixed-size pool of logged-in SMTP connections, so a send reuses an open
+    STARTTLS session instead of paying connect + TLS + AUTH every message.
+
+    Connections are opened lazily (up to `size`), recycled after
+    MAX_MESSAGES_PER_CONNECTION sends, and checked with NOOP when they have
+    been idle longer than IDLE_CHECK_SECONDS.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._idle: asyncio.Queue[_PooledConnection] = asyncio.Queue()
+        self._slots = asyncio.Semaphore(size)
+
+    @staticmethod
+    async def _connect() -> _PooledConnection:
+        client = aiosmtplib.SMTP(
+            hostname=settings.SMTP_SERVER,
+            port=settings.SMTP_PORT,
+            username=settings.SMTP_USER,
+            password=settings.SMTP_PASSWORD,
+            start_tls=True,
+            validate_certs=True
+        )
+        await client.connect()  # Connects, STARTTLS, then logs in
+        return _PooledConnection(client)
+
+    @staticmethod
+    async def _discard(conn: _PooledConnection):
+        try:
+            await conn.client.quit()
+        except Exception:
+            conn.client.close()
+
+    async def _checkout(self) -> _PooledConnection:
+        while not self._idle.empty():
+            conn = self._idle.get_nowait()
+            if not conn.client.is_connected or conn.sent >= MAX_MESSAGES_PER_CONNECTION:
+                await self._discard(conn)
+                continue
+            if time.monotonic() - conn.last_used > IDLE_CHECK_SECONDS:
+                try:
+                    await conn.client.noop()
+                except aiosmtplib.SMTPException:
+                    await self._discard(conn)
+                    continue
+            return conn
+        return await self._connect()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[aiosmtplib.SMTP]:
+        """Borrow a connection; it is returned to the pool unless the send failed."""
+        async with self._slots:
+            conn = await self._checkout()
+            try:
+                yield conn.client
+            except BaseException:
+                await self._discard(conn)
+                raise
+            conn.sent += 1
+            conn.last_used = time.monotonic()
+            self._idle.put_nowait(conn)
+
+    async def send_message(self, message: EmailMessage):
+        """Send on a pooled connection, retrying once if the server dropped it."""
+        try:
+            async with self.acquire() as client:
+                await client.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            async with self.acquire() as client:
+                await client.send_message(message)
+
+    async def close(self):
+        while not self._idle.empty():
+            await self._discard(self._idle.get_nowait())
+
+
+_pool: Optional[SMTPPool] = None
+_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_smtp_pool() -> SMTPPool:
+    """
+    Shared SMTP pool for the current process, created lazily on first send.
+    Connections belong to an event loop, so a new loop gets a new pool.
+    """
+    global _pool, _pool_loop
+    loop = asyncio.get_running_loop()
+    if _pool is None or _pool_loop is not loop:
+        _pool = SMTPPool(settings.SMTP_POOL_SIZE)
+        _pool_loop = loop
+    return _pool
+
+
+async def close_smtp_pool():
+    """QUIT all idle pooled connections (app shutdown)."""
+    global _pool, _pool_loop
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+        _pool_loop = None
+        logger.info("📪 SMTP pool closed")
@@ -1,26 +1,34 @@
-from fastapi import FastAPI, Request
+import asyncio
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from app.core.config import settings
 from app.api.v1.router import api_router
 from contextlib import asynccontextmanager
-from app.core.db import init_db
+from app.core.db import init_db, close_db
 from app.core.redis_manager import redis_manager
+from app.core.http_client import close_http_client
+from app.core.smtp_pool import close_smtp_pool
+from app.services.analytics import flush_events
 from app.utils.cache_warmer import warm_all_caches
 import logging
-import time
 
 logger = logging.getLogger(__name__)
 
+def _log_warm_result(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Cache warming failed (non-critical): {task.exception()}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("🚀 Starting Waypoint application...")
     await init_db()
+    await redis_manager.init_all()
     
-    # Warm caches on startup
-    try:
-        await warm_all_caches()
-    except Exception as e:
-        logger.warning(f"Cache warming failed (non-critical): {e}")
+    # Warm caches in the background so the pod is ready immediately; routes
+    # already fall back to the database on a cache miss while this runs
+    warm_task = asyncio.create_task(warm_all_caches(), name="cache-warmer")
+    warm_task.add_done_callback(_log_warm_result)
     
     logger.info("✅ Application startup complete")
     
@@ -28,15 +36,25 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("🛑 Shutting down Waypoint application...")
+    warm_task.cancel()
     await redis_manager.close_all()
+    await close_http_client()
+    await close_smtp_pool()
+    flush_events()
+    close_db()
     logger.info("✅ Application shutdown complete")
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# Middleware: Starlette wraps in reverse order of add_middleware, so the last one
+# added is outermost. Order (outer -> inner): Performance -> ProxyHeaders -> CORS,
+# so X-Process-Time covers the full stack including CORS preflights.
+
 # CORS Middleware
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -55,32 +73,9 @@ app.add_middleware(
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 app.add_middleware(ProxyHeadersMiddleware, trusted_hosts="*")
 
-
-
-# Performance Logging Middleware
-@app.middleware("http")
-async def performance_logging(request: Request, call_next):
-    start_time = time.time()
-    
-    response = await call_next(request)
-    
-    process_time = (time.time() - start_time) * 1000  # Convert to ms
-    
-    # Add performance header
-    response.headers["X-Process-Time"] = f"{process_time:.2f}ms"
-    
-    # Add rate limit headers if available
-    if hasattr(request.state, "rate_limit_info"):
-        info = request.state.rate_limit_info
-        response.headers["X-RateLimit-Limit"] = str(info.get("limit", ""))
-        response.headers["X-RateLimit-Remaining"] = str(info.get("remaining", ""))
-        response.headers["X-RateLimit-Reset"] = str(info.get("reset", ""))
-    
-    # Log slow requests
-    if process_time > 1000:  # > 1 second
-        logger.warning(f"⚠️ Slow request: {request.method} {request.url.path} took {process_time:.2f}ms")
-    
-    return response
+# Performance Logging Middleware (pure ASGI, see app/core/middleware.py) - must stay last
+from app.core.middleware import PerformanceMiddleware
+app.add_middleware(PerformanceMiddleware)
 
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
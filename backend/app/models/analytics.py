@@ -1,26 +1,25 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from beanie import Document
 from pydantic import Field
 
 class AnalyticsEvent(Document):
     owner_id: str
+    tenant_id: str | None = None
     event_type: str # ingest, delivery_success, delivery_failed, rejection
     source_id: str
     vendor_id: str | None = None
     customer_id: str | None = None
     campaign_id: str | None = None
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     meta: dict = {}
     
     class Settings:
         name = "analytics_events"
+        # Compound indexes matching the actual queries only; this collection is
+        # write-heavy, so every extra index is paid on each event insert
         indexes = [
-            "owner_id",
-            "event_type",
-            "source_id",
-            "vendor_id",
-            "customer_id",
-            "campaign_id",
-            "timestamp",
-            [("owner_id", 1), ("timestamp", -1)]
+            [("owner_id", 1), ("event_type", 1), ("timestamp", -1)],  # source stats windows
+            [("owner_id", 1), ("source_id", 1), ("timestamp", -1)],  # per-source all-time counts
+            [("owner_id", 1), ("timestamp", -1)],  # dashboard events in period (no tenant)
+            [("tenant_id", 1), ("timestamp", -1)]  # dashboard events in period (tenant)
         ]
@@ -1,5 +1,5 @@
 from typing import List, Optional, Literal
-from datetime import datetime
+from datetime import datetime, timezone
 from beanie import Document
 from pydantic import BaseModel, Field
 import uuid
@@ -54,7 +54,7 @@ class Campaign(Document):
     rules: SourceRules = SourceRules()
     mapping: SourceMapping = SourceMapping()
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     
     class Settings:
         name = "campaigns"
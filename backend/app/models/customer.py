@@ -1,39 +1,45 @@
-from typing import List, Optional, Dict, Any, Literal
-from datetime import datetime
+from typing import Annotated, List, Optional, Dict, Any, Literal
+from datetime import datetime, timezone
 from beanie import Document, Link
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, BeforeValidator, Field
 import uuid
 from app.models.campaign import Campaign
 from app.models.destination import Destination
 
 
+def _to_str_id(v):
+    """Normalize a stored reference (str, DBRef dict, Link, DBRef/ObjectId) to a string id."""
+    # Checks ordered by how often each shape appears in stored documents
+    if isinstance(v, str) or v is None:
+        return v
+    # Handle DBRef as dict
+    if isinstance(v, dict) and '$id' in v:
+        val = v['$id']
+        if isinstance(val, dict) and '$oid' in val:
+            return str(val['$oid'])
+        return str(val)
+    # Handle Link objects
+    ref = getattr(v, 'ref', None)
+    if ref is not None and ref.id:
+        return str(ref.id)
+    # Handle pymongo DBRef or raw ObjectId
+    if hasattr(v, 'id'):
+        return str(v.id)
+    return str(v)
+
+
+StrId = Annotated[str, BeforeValidator(_to_str_id)]
+
+
 class Customer(Document):
     tenant_id: str
     owner_id: str
     name: str
     status: Literal["enabled", "disabled"] = "enabled"
     readable_id: Optional[str] = None
-    destinations: List[str] = []
-    campaigns: List[str] = []
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-
-    @validator("destinations", "campaigns", pre=True, each_item=True)
-    def coerce_to_string_id(cls, v):
-        if v is None:
-            return v
-        # Handle Link objects
-        if hasattr(v, 'ref') and v.ref.id:
-            return str(v.ref.id)
-        # Handle DBRef as dict or object
-        if isinstance(v, dict) and '$id' in v:
-            val = v['$id']
-            if isinstance(val, dict) and '$oid' in val:
-                return str(val['$oid'])
-            return str(val)
-        # Handle pymongo DBRef or raw ObjectId
-        if hasattr(v, 'id'):
-            return str(v.id)
-        return str(v)
+    destinations: List[StrId] = []
+    campaigns: List[StrId] = []
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     
     class Settings:
         name = "customers"
@@ -1,5 +1,5 @@
 from typing import List, Optional, Dict, Any, Literal
-from datetime import datetime
+from datetime import datetime, timezone
 from beanie import Document
 from pydantic import BaseModel, Field
 import uuid
@@ -29,8 +29,8 @@ class Destination(Document):
     approval_date: Optional[datetime] = None  # When it was approved/rejected
     rejection_reason: Optional[str] = None  # Reason for rejection
 
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
     class Settings:
         name = "destinations"
@@ -1,5 +1,5 @@
 from typing import Dict, Any, Optional, List, Literal
-from datetime import datetime
+from datetime import datetime, timezone
 from beanie import Document
 from pydantic import Field, BaseModel
 
@@ -11,7 +11,7 @@ class RoutingResult(BaseModel):
     destination_id: Optional[str] = None
     destination_name: Optional[str] = None
     status: str  # delivered, failed, skipped
-    delivered_at: datetime = Field(default_factory=datetime.utcnow)
+    delivered_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     error_message: Optional[str] = None
 
 class Lead(Document):
@@ -25,23 +25,31 @@ class Lead(Document):
     original_payload: Dict[str, Any]
     status: Literal["new", "processed", "exported", "rejected"] = "new"
     rejection_reason: Optional[str] = None
+    is_duplicate: bool = False  # Set at ingest; avoids regex scans of rejection_reason in stats
     routing_results: List[RoutingResult] = []
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     processed_at: Optional[datetime] = None
 
     class Settings:
         name = "leads"
+        # tenant_id, owner_id and source_id lookups use the compound indexes
+        # below, which all start with one of them
         indexes = [
-            "tenant_id",
-            "owner_id",
             "vendor_id",
-            "source_id",
             "status",
             "created_at",
             "lead_id",
             "external_id",
-            "external_id",
             [("owner_id", 1), ("created_at", -1)],
-            [("$**", "text")]
+            # Vendor/source stats pipelines: tenant + vendor/source match, created_at buckets
+            [("tenant_id", 1), ("vendor_id", 1), ("created_at", -1), ("status", 1), ("is_duplicate", 1)],
+            [("tenant_id", 1), ("source_id", 1), ("created_at", -1), ("status", 1), ("is_duplicate", 1)],
+            # Customer/campaign stats: tenant + routed customer (multikey), created_at buckets
+            [("tenant_id", 1), ("routing_results.customer_id", 1), ("created_at", -1)],
+            # Vendor leads search: case-sensitive phone prefix lookups
+            [("tenant_id", 1), ("data.phone", 1)],
+            # Duplicate check: per-source existence probe on the default dupe fields
+            [("source_id", 1), ("data.email", 1), ("created_at", -1)],
+            [("source_id", 1), ("data.phone", 1), ("created_at", -1)]
         ]
         language_override = "none" # Disable language override to prevent errors with 'language' field in data
@@ -0,0 +1,27 @@
+from datetime import datetime, timezone
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel
+
+class LeadDailyStats(Document):
+    """
+    Per-vendor per-day lead rollup (UTC days), materialized from the leads
+    collection by the rollup_lead_daily_stats_task Celery beat task.
+    """
+    tenant_id: str
+    vendor_id: str
+    date: str  # YYYY-MM-DD
+    leads: int = 0
+    duplicates: int = 0
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "lead_daily_stats"
+        indexes = [
+            # Unique key used by the rollup $merge and history range reads
+            IndexModel(
+                [("tenant_id", 1), ("vendor_id", 1), ("date", 1)],
+                unique=True,
+                name="tenant_vendor_date_uniq"
+            )
+        ]
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, Literal, List
 from beanie import Document
 from pydantic import BaseModel, Field
@@ -22,8 +22,8 @@ class SystemField(Document):
     description: Optional[str] = None
     is_required: bool = False
     aliases: List[AliasEntry] = Field(default_factory=list, description="Global list of aliases for this field")
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
     class Settings:
         name = "system_fields"
@@ -1,5 +1,5 @@
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
 from beanie import Document, Indexed
 from pydantic import Field, EmailStr
 
@@ -8,8 +8,8 @@ class Tenant(Document):
     slug: Indexed(str, unique=True)
     owner_id: str  # User ID of the tenant owner
     status: str = "active"  # active, suspended, disabled
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
     class Settings:
         name = "tenants"
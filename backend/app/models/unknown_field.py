@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, Any, Literal
 from beanie import Document
 from pydantic import Field
@@ -11,8 +11,8 @@ class UnknownField(Document):
     sample_value: Optional[str] = Field(None, description="A sample value caught during ingestion")
     detected_count: int = Field(default=1, description="Number of times this field has been seen")
     status: Literal["unmapped", "mapped", "ignored"] = "unmapped"
-    first_seen: datetime = Field(default_factory=datetime.utcnow)
-    last_seen: datetime = Field(default_factory=datetime.utcnow)
+    first_seen: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    last_seen: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
     class Settings:
         name = "unknown_fields"
@@ -1,12 +1,12 @@
 from typing import Optional, List
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pydantic import BaseModel, Field, EmailStr
 from beanie import Document, Indexed
 
 class RefreshToken(BaseModel):
     token_hash: str
     expires_at: datetime
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class User(Document):
     email: Indexed(EmailStr, unique=True)
@@ -27,13 +27,13 @@ class User(Document):
     tenant_id: Optional[str] = None  # Reference to Tenant ID
     role: str = "user"  # super_admin, admin, user, or custom role name
     role_id: Optional[str] = None  # Reference to custom Role ID
-    permissions: List[str] = [] # Transient field (dynamically merged from roles)
+    permissions: List[str] = [] # Merged role + custom role permissions, refreshed on role changes
     invited_by: Optional[str] = None  # User ID of admin who invited
     invitation_token: Optional[str] = None  # For email invitation
     invitation_expires: Optional[datetime] = None  # Token expiry (24 hours)
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
     class Settings:
         name = "users"
@@ -6,7 +6,7 @@ import uuid
 from app.models.mapping import SourceMapping
 from app.models.normalization import SourceNormalization
 from app.models.rules import SourceRules
-from pydantic import model_validator
+from pymongo import IndexModel
 
 
 
@@ -32,24 +32,6 @@ class SourceConfig(BaseModel):
     dupe_field_2: Optional[str] = None
     dupe_field_operator: str = "or" # Literal["or", "and"]
 
-    @model_validator(mode='before')
-    @classmethod
-    def upgrade_legacy_fields(cls, data):
-        if isinstance(data, dict):
-            # Map legacy 'active' status to 'enabled'
-            if data.get('status') == 'active':
-                data['status'] = 'enabled'
-            
-            # Handle legacy 'enabled' boolean if present
-            # If enabled was explicitly False, respect it.
-            if 'enabled' in data:
-                if data['enabled'] is False:
-                    data['status'] = 'disabled'
-                # If enabled is True, status takes precedence (which we just mapped)
-                # Remove the legacy field so strict validation doesn't fail
-                data.pop('enabled')
-        return data
-
 
 class SourceValidationConfig(BaseModel):
     validation_type: Optional[str] = None
@@ -57,14 +39,13 @@ class SourceValidationConfig(BaseModel):
     validation_field: Optional[str] = None
     validation_api_key: Optional[str] = None
     
-import string
-import random
+import base64
+import secrets
 
 def generate_readable_id(prefix: str, length: int = 6) -> str:
-    """Generates a random ID like VND-1A2B3C"""
-    chars = string.ascii_uppercase + string.digits
-    suffix = ''.join(random.choice(chars) for _ in range(length))
-    return f"{prefix}-{suffix}"
+    """Generates a random ID like VND-4A2B3C (base32: A-Z, 2-7)"""
+    raw = secrets.token_bytes((length * 5 + 7) // 8)
+    return f"{prefix}-{base64.b32encode(raw).decode()[:length]}"
 
 class Source(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -86,16 +67,10 @@ class Vendor(Document):
     readable_id: Optional[str] = None
     status: Literal["enabled", "disabled"] = "enabled"
 
-    @model_validator(mode='before')
-    @classmethod
-    def upgrade_legacy_status(cls, data):
-        if isinstance(data, dict):
-            if data.get('status') == 'active':
-                data['status'] = 'enabled'
-        return data
-
     sources: List[Source] = []
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Bumped (throttled) by the processing engine; None means the vendor never received a lead
+    last_lead_at: Optional[datetime] = None
     
     class Settings:
         name = "vendors"
@@ -104,5 +79,13 @@ class Vendor(Document):
             "owner_id",
             "readable_id",
             "status",
-            "created_at"
+            "created_at",
+            # find_vendor lookups; also keeps readable ids unique per tenant
+            # (partial so legacy vendors without a readable_id don't collide)
+            IndexModel(
+                [("tenant_id", 1), ("readable_id", 1)],
+                unique=True,
+                name="tenant_readable_uniq",
+                partialFilterExpression={"readable_id": {"$type": "string"}}
+            )
         ]
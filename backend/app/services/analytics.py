@@ -1,26 +1,171 @@
+import asyncio
+import os
+import threading
 from datetime import datetime, timedelta
+from typing import List, Optional
+from pymongo import MongoClient, WriteConcern
+from pymongo.collection import Collection
+from app.core.config import settings
 from app.models.analytics import AnalyticsEvent
 from app.models.vendor import Vendor
 from app.models.vendor import Source
+import redis
+from app.utils.cache import CACHE_VERSION, cache_get, cache_set
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Opt-in fire-and-forget writes for analytics events (log_event(fire_and_forget=True))
+EVENT_WRITE_CONCERN = WriteConcern(w=0)
+
+# Acknowledged events are buffered per process and written with insert_many
+# every EVENT_FLUSH_INTERVAL seconds, or as soon as EVENT_BATCH_SIZE are pending
+EVENT_BATCH_SIZE = 500
+EVENT_FLUSH_INTERVAL = 1.0
+
+# Dashboard stats are polled; recompute at most once per TTL per tenant/period
+STATS_CACHE_TTL = 30
+STATS_CACHE_PREFIX = "analytics_stats"
+
+def _stats_cache_key(owner_id: str, tenant_id: Optional[str], period: str) -> str:
+    scope = f"tenant:{tenant_id}" if tenant_id else f"owner:{owner_id}"
+    return f"{STATS_CACHE_PREFIX}:{CACHE_VERSION}:{scope}:{period}"
+
+class EventBuffer:
+    """
+    Per-process analytics event buffer drained by a daemon thread with its own
+    synchronous clients. Flushing must not depend on an event loop running:
+    Celery tasks only run their loop while a task executes, so a loop-based
+    timer would hold an idle worker's last events indefinitely.
+
+    After each batch is written, the cached 24h dashboard stats of every
+    owner/tenant in it are dropped with a single DEL.
+    """
+
+    def __init__(self):
+        self._pid: Optional[int] = None
+        self._collection: Optional[Collection] = None
+        self._redis: Optional[redis.Redis] = None
+
+    def _reset(self):
+        # First use, or first use after a fork (prefork Celery children): the
+        # parent's pending events and flusher thread are not ours
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._events: List[dict] = []
+        self._collection = None
+        self._redis = None
+        threading.Thread(target=self._run, name="analytics-event-flusher", daemon=True).start()
+
+    def add(self, event: dict):
+        if self._pid != os.getpid():
+            self._reset()
+        with self._lock:
+            self._events.append(event)
+            pending = len(self._events)
+        if pending >= EVENT_BATCH_SIZE:
+            self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(EVENT_FLUSH_INTERVAL)
+            self._wake.clear()
+            self.flush()
+
+    def _get_collection(self) -> Collection:
+        if self._collection is None:
+            client = MongoClient(settings.MONGODB_URI, maxPoolSize=2, retryWrites=True)
+            self._collection = client.get_default_database()[AnalyticsEvent.Settings.name]
+        return self._collection
+
+    def _get_redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(settings.REDIS_CACHE_URL, max_connections=2)
+        return self._redis
+
+    def _invalidate_stats(self, batch: List[dict]):
+        keys = set()
+        for event in batch:
+            keys.add(_stats_cache_key(event["owner_id"], event.get("tenant_id"), "24h"))
+            keys.add(_stats_cache_key(event["owner_id"], None, "24h"))
+        try:
+            self._get_redis().delete(*keys)
+        except Exception as e:
+            logger.error(f"Failed to invalidate analytics stats cache: {e}")
+
+    def flush(self):
+        """Write all pending events (acknowledged, retried once on failover by retryWrites)."""
+        if self._pid != os.getpid():
+            return
+        with self._lock:
+            batch, self._events = self._events, []
+        if not batch:
+            return
+        try:
+            self._get_collection().insert_many(batch, ordered=False)
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} analytics events: {e}")
+            return
+        self._invalidate_stats(batch)
+
+_event_buffer = EventBuffer()
+
+def flush_events():
+    """Write buffered analytics events now (process shutdown)."""
+    _event_buffer.flush()
 
 class AnalyticsEngine:
     @staticmethod
-    async def log_event(event_type: str, source_id: str, owner_id: str, **kwargs):
+    async def log_event(event_type: str, source_id: str, owner_id: str, fire_and_forget: bool = False, **kwargs):
         """
-        Logs an analytics event asynchronously.
+        Logs an analytics event. By default it is buffered and written in
+        acknowledged batches within EVENT_FLUSH_INTERVAL seconds; callers that
+        can lose the event pass fire_and_forget=True for an unacknowledged
+        (w=0) single insert instead.
         """
-        event = AnalyticsEvent(
-            event_type=event_type,
-            source_id=source_id,
-            owner_id=owner_id,
-            timestamp=datetime.utcnow(),
+        event = {
+            "owner_id": owner_id,
+            "tenant_id": None,
+            "event_type": event_type,
+            "source_id": source_id,
+            "vendor_id": None,
+            "customer_id": None,
+            "campaign_id": None,
+            "timestamp": datetime.utcnow(),
+            "meta": {},
             **kwargs
-        )
-        await event.create()
+        }
+        if fire_and_forget:
+            collection = AnalyticsEvent.get_pymongo_collection().with_options(write_concern=EVENT_WRITE_CONCERN)
+            await collection.insert_one(event)
+        else:
+            _event_buffer.add(event)
         return event
 
     @staticmethod
     async def get_stats(owner_id: str, tenant_id: str = None, period: str = "24h"):
+        """
+        Dashboard stats, cached for STATS_CACHE_TTL seconds per tenant (or owner) and period.
+        """
+        cache_key = _stats_cache_key(owner_id, tenant_id, period)
+        try:
+            cached = await cache_get(cache_key)
+            if cached is not None:
+                return cached
+        except Exception as e:
+            logger.error(f"Analytics stats cache read error: {e}")
+
+        stats = await AnalyticsEngine._compute_stats(owner_id, tenant_id, period)
+        if "error" not in stats:
+            try:
+                await cache_set(cache_key, stats, STATS_CACHE_TTL)
+            except Exception as e:
+                logger.error(f"Analytics stats cache write error: {e}")
+        return stats
+
+    @staticmethod
+    async def _compute_stats(owner_id: str, tenant_id: str = None, period: str = "24h"):
         """
         Computes aggregate stats for the dashboard.
         """
@@ -37,53 +182,59 @@ class AnalyticsEngine:
         try:
             from app.models.customer import Customer
             from app.models.customer import Customer
-            from app.models.user import User
             from app.models.campaign import Campaign
 
             # Determine query filter
             vendor_filter = {"owner_id": owner_id}
             customer_filter = {"owner_id": owner_id}
             
-            # For Events, we need a list of owner_ids if tenant_id is present (since events don't have tenant_id)
-            event_owner_ids = [owner_id]
+            # Events carry tenant_id, so tenant dashboards count a single index range
+            event_filter = {"owner_id": owner_id}
 
             if tenant_id:
                 vendor_filter = {"tenant_id": tenant_id}
                 customer_filter = {"tenant_id": tenant_id}
-                
-                # Fetch all users in tenant to aggregate events
-                tenant_users = await User.find(User.tenant_id == tenant_id).to_list()
-                event_owner_ids = [str(u.id) for u in tenant_users]
+                event_filter = {"tenant_id": tenant_id}
 
-            # 1. Total Vendors
-            total_vendors = await Vendor.find(vendor_filter).count()
-            
-            # 2. Active Sources
+            # Vendors, customers and campaigns all index tenant_id and owner_id;
+            # hint the one matching the filter so the planner never has to choose.
+            # A hint on a missing index fails the query, so only hint when this
+            # process created the indexes.
+            count_options = {}
+            if not settings.MONGODB_SKIP_INDEX_CREATION:
+                count_options["hint"] = [("tenant_id", 1)] if tenant_id else [("owner_id", 1)]
+
+            # 2. Active Sources (count per vendor with $filter; no $unwind into one row per source)
             pipeline = [
                 {"$match": vendor_filter},
-                {"$unwind": "$sources"},
-                {"$match": {"sources.config.status": "enabled"}},
-                {"$count": "count"}
+                {"$project": {"n": {"$size": {"$filter": {
+                    "input": {"$ifNull": ["$sources", []]},
+                    "as": "s",
+                    "cond": {"$eq": ["$$s.config.status", "enabled"]}
+                }}}}},
+                {"$group": {"_id": None, "count": {"$sum": "$n"}}}
             ]
-            active_sources_res = await Vendor.get_pymongo_collection().aggregate(pipeline).to_list(None)
-            active_sources = active_sources_res[0]["count"] if active_sources_res else 0
 
-            # 3. Total Customers
-            total_customers = await Customer.find(customer_filter).count()
-
-            # 4. Active Campaigns
             # 4. Active Campaigns
             # We can query Campaign collection directly since it has owner_id/tenant_id
             campaign_filter = vendor_filter.copy() # Same filter (owner_id or tenant_id)
             campaign_filter["config.status"] = "enabled"
-            
-            active_campaigns = await Campaign.find(campaign_filter).count()
 
-            # 5. Events Today
-            events_today = await AnalyticsEvent.find(
-                {"owner_id": {"$in": event_owner_ids}},
-                AnalyticsEvent.timestamp >= start_time
-            ).count()
+            # The five counts are independent: run them concurrently
+            total_vendors, active_sources_res, total_customers, active_campaigns, events_today = await asyncio.gather(
+                # 1. Total Vendors
+                Vendor.get_pymongo_collection().count_documents(vendor_filter, **count_options),
+                Vendor.get_pymongo_collection().aggregate(pipeline).to_list(None),
+                # 3. Total Customers
+                Customer.get_pymongo_collection().count_documents(customer_filter, **count_options),
+                Campaign.get_pymongo_collection().count_documents(campaign_filter, **count_options),
+                # 5. Events Today
+                AnalyticsEvent.find(
+                    event_filter,
+                    AnalyticsEvent.timestamp >= start_time
+                ).count()
+            )
+            active_sources = active_sources_res[0]["count"] if active_sources_res else 0
             
             return {
                 "total_vendors": total_vendors,
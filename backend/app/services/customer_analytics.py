@@ -1,8 +1,56 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
 from typing import List, Dict, Any
 from app.models.customer import Customer
 from app.models.lead import Lead
 
+# Per-status counters shared by every stats $group
+STATUS_COUNTS = {
+    "assigned": {"$sum": 1},
+    "delivered": {"$sum": {"$cond": [{"$eq": ["$routing_results.status", "delivered"]}, 1, 0]}},
+    "rejected": {"$sum": {"$cond": [{"$in": ["$routing_results.status", ["failed", "rejected"]]}, 1, 0]}}
+}
+
+ZERO_COUNTS = {"assigned": 0, "delivered": 0, "rejected": 0}
+
+
+@lru_cache(maxsize=1)
+def _timeframes(today: date):
+    """(label, start, end) for each stats column; None means unbounded. Bounds only change at midnight (UTC)."""
+    today_start = datetime.combine(today, time())
+    return (
+        ("today", today_start, None),
+        ("yesterday", today_start - timedelta(days=1), today_start),
+        ("last_week", today_start - timedelta(days=7), None),
+        ("last_month", today_start - timedelta(days=30), None),
+        ("ninety_days", today_start - timedelta(days=90), None),
+        ("six_months", today_start - timedelta(days=180), None),
+        ("last_year", today_start - timedelta(days=365), None),
+        ("all_time", None, None)
+    )
+
+
+def _timeframe_facets(timeframes, group_id) -> Dict[str, list]:
+    """One $facet sub-pipeline per timeframe, each grouping the unwound routing results."""
+    facets = {}
+    for label, start_date, end_date in timeframes:
+        stages = []
+        time_query = {}
+        if start_date:
+            time_query["$gte"] = start_date
+        if end_date:
+            time_query["$lt"] = end_date
+        if time_query:
+            stages.append({"$match": {"created_at": time_query}})
+        stages.append({"$group": {"_id": group_id, **STATUS_COUNTS}})
+        facets[label] = stages
+    return facets
+
+
+def _counts(res: Dict[str, Any]) -> Dict[str, int]:
+    return {"assigned": res["assigned"], "delivered": res["delivered"], "rejected": res["rejected"]}
+
+
 class CustomerAnalyticsService:
     @staticmethod
     async def get_customer_stats_table(tenant_id: str, search: str = "") -> List[Dict[str, Any]]:
@@ -19,81 +67,55 @@ class CustomerAnalyticsService:
             return []
 
         # 2. Define Timeframes
-        now = datetime.utcnow()
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        yesterday_start = today_start - timedelta(days=1)
-        last_week_start = today_start - timedelta(days=7)
-        last_month_start = today_start - timedelta(days=30)
-        ninety_days_start = today_start - timedelta(days=90)
-        six_months_start = today_start - timedelta(days=180)
-        last_year_start = today_start - timedelta(days=365)
+        timeframes = _timeframes(datetime.utcnow().date())
+        customer_ids = [str(customer.id) for customer in customers]
 
-        results = []
-
-        for customer in customers:
-            customer_id_str = str(customer.id)
-            
-            # Helper to query counts
-            async def get_counts(start_date: datetime = None, end_date: datetime = None):
-                match_query = {
-                    "routing_results.customer_id": customer_id_str,
-                    "tenant_id": tenant_id
-                }
-                
-                # Time clamping
-                time_query = {}
-                if start_date:
-                    time_query["$gte"] = start_date
-                if end_date:
-                    time_query["$lt"] = end_date
-                
-                if time_query:
-                    match_query["created_at"] = time_query
-
-                # We need to count based on the routing_results status for THIS customer
-                # MongoDB aggregation is best here for performance
-                pipeline = [
-                    {"$match": match_query},
-                    {"$unwind": "$routing_results"},
-                    {"$match": {"routing_results.customer_id": customer_id_str}},
-                    {"$group": {
-                        "_id": None,
-                        "assigned": {"$sum": 1},
-                        "delivered": {"$sum": {"$cond": [{"$eq": ["$routing_results.status", "delivered"]}, 1, 0]}},
-                        "rejected": {"$sum": {"$cond": [{"$in": ["$routing_results.status", ["failed", "rejected"]]}, 1, 0]}}
+        # 3. One tenant-wide pass: label each routing result with the newest
+        # timeframe start it falls after (starts are in descending order), then
+        # group by (customer, bucket). Cumulative columns are summed below.
+        bucket_starts = [(label, start) for label, start, _ in timeframes if start]
+        pipeline = [
+            {"$match": {"tenant_id": tenant_id, "routing_results.customer_id": {"$in": customer_ids}}},
+            {"$project": {"created_at": 1, "routing_results": 1}},
+            {"$unwind": "$routing_results"},
+            {"$match": {"routing_results.customer_id": {"$in": customer_ids}}},
+            {"$group": {
+                "_id": {
+                    "customer": "$routing_results.customer_id",
+                    "bucket": {"$switch": {
+                        "branches": [
+                            {"case": {"$gte": ["$created_at", start]}, "then": label}
+                            for label, start in bucket_starts
+                        ],
+                        "default": "all_time"
                     }}
-                ]
-                
-                agg_res = await Lead.get_pymongo_collection().aggregate(pipeline).to_list(1)
-                if not agg_res:
-                    return {"assigned": 0, "delivered": 0, "rejected": 0}
-                return agg_res[0]
-
-            # Collect stats for each timeframe
-            today = await get_counts(start_date=today_start)
-            yesterday = await get_counts(start_date=yesterday_start, end_date=today_start)
-            last_week = await get_counts(start_date=last_week_start)
-            last_month = await get_counts(start_date=last_month_start)
-            ninety_days = await get_counts(start_date=ninety_days_start)
-            six_months = await get_counts(start_date=six_months_start)
-            last_year = await get_counts(start_date=last_year_start)
-            all_time = await get_counts()
+                },
+                **STATUS_COUNTS
+            }}
+        ]
+
+        buckets: Dict[str, Dict[str, Dict[str, int]]] = {}
+        async for res in Lead.get_pymongo_collection().aggregate(pipeline):
+            buckets.setdefault(res["_id"]["customer"], {})[res["_id"]["bucket"]] = _counts(res)
+
+        results = []
+        for customer, customer_id_str in zip(customers, customer_ids):
+            customer_buckets = buckets.get(customer_id_str, {})
+            stats = {}
+            running = ZERO_COUNTS
+            for label, _, end_date in timeframes:
+                bucket = customer_buckets.get(label, ZERO_COUNTS)
+                running = {k: running[k] + bucket[k] for k in running}
+                # Bounded windows (yesterday) are their own bucket; open-ended ones
+                # include every newer bucket too
+                stats[label] = dict(bucket) if end_date else running
 
             results.append({
                 "id": customer_id_str,
                 "readable_id": customer.readable_id or customer_id_str[:8].upper(),
                 "name": customer.name,
                 "status": customer.status,
-                "stats": {
-                    "today": today,
-                    "yesterday": yesterday,
-                    "last_week": last_week,
-                    "last_month": last_month,
-                    "ninety_days": ninety_days,
-                    "six_months": six_months,
-                    "last_year": last_year,
-                    "all_time": all_time
-                }
+                "stats": stats
             })
 
         return results
@@ -104,73 +126,27 @@ class CustomerAnalyticsService:
         Returns a dict: { campaign_id: { today: {...}, yesterday: {...}, ... } }
         """
         # 1. Define Timeframes
-        now = datetime.utcnow()
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        yesterday_start = today_start - timedelta(days=1)
-        last_week_start = today_start - timedelta(days=7)
-        last_month_start = today_start - timedelta(days=30)
-        ninety_days_start = today_start - timedelta(days=90)
-        six_months_start = today_start - timedelta(days=180)
-        last_year_start = today_start - timedelta(days=365)
-
-        timeframe_configs = [
-            ("today", today_start, None),
-            ("yesterday", yesterday_start, today_start),
-            ("last_week", last_week_start, None),
-            ("last_month", last_month_start, None),
-            ("ninety_days", ninety_days_start, None),
-            ("six_months", six_months_start, None),
-            ("last_year", last_year_start, None),
-            ("all_time", None, None)
-        ]
+        timeframes = _timeframes(datetime.utcnow().date())
 
-        # Initializing stats structure
         # We'll use a nested dict: results[campaign_id][timeframe_label] = stats
         campaign_stats = {}
 
-        # 2. First pass: Collect all campaign IDs that have stats in ANY timeframe
-        # This is more efficient than doing it inside the loop if we want full consistency
-        all_campaign_ids = set()
-
-        for label, start_date, end_date in timeframe_configs:
-            match_query = {
-                "routing_results.customer_id": customer_id,
-                "tenant_id": tenant_id
-            }
-            
-            time_query = {}
-            if start_date:
-                time_query["$gte"] = start_date
-            if end_date:
-                time_query["$lt"] = end_date
-            
-            if time_query:
-                match_query["created_at"] = time_query
-
-            pipeline = [
-                {"$match": match_query},
-                {"$unwind": "$routing_results"},
-                {"$match": {"routing_results.customer_id": customer_id}},
-                {"$group": {
-                    "_id": "$routing_results.campaign_id",
-                    "assigned": {"$sum": 1},
-                    "delivered": {"$sum": {"$cond": [{"$eq": ["$routing_results.status", "delivered"]}, 1, 0]}},
-                    "rejected": {"$sum": {"$cond": [{"$in": ["$routing_results.status", ["failed", "rejected"]]}, 1, 0]}}
-                }}
-            ]
-            
-            agg_results = await Lead.get_pymongo_collection().aggregate(pipeline).to_list(None)
-            
-            for res in agg_results:
+        # 2. Single pass: every timeframe is a $facet grouping by campaign
+        pipeline = [
+            {"$match": {"routing_results.customer_id": customer_id, "tenant_id": tenant_id}},
+            {"$project": {"created_at": 1, "routing_results": 1}},
+            {"$unwind": "$routing_results"},
+            {"$match": {"routing_results.customer_id": customer_id}},
+            {"$facet": _timeframe_facets(timeframes, "$routing_results.campaign_id")}
+        ]
+        facet_res = await Lead.get_pymongo_collection().aggregate(pipeline).to_list(1)
+        facet_res = facet_res[0] if facet_res else {}
+
+        for label, _, _ in timeframes:
+            for res in facet_res.get(label, []):
                 camp_id = res["_id"]
-                all_campaign_ids.add(camp_id)
                 if camp_id not in campaign_stats:
-                    campaign_stats[camp_id] = {l: {"assigned": 0, "delivered": 0, "rejected": 0} for l, _, _ in timeframe_configs}
-                
-                campaign_stats[camp_id][label] = {
-                    "assigned": res["assigned"],
-                    "delivered": res["delivered"],
-                    "rejected": res["rejected"]
-                }
+                    campaign_stats[camp_id] = {l: dict(ZERO_COUNTS) for l, _, _ in timeframes}
+                campaign_stats[camp_id][label] = _counts(res)
 
         return campaign_stats
@@ -2,6 +2,7 @@ import httpx
 from typing import Dict, Any
 from app.models.customer import Customer, Destination
 from app.models.campaign import Campaign
+from app.core.http_client import get_http_client
 
 class DeliveryEngine:
     @staticmethod
@@ -25,33 +26,47 @@ class DeliveryEngine:
             pass
             
         try:
-            async with httpx.AsyncClient(timeout=config.timeout) as client:
-                req_kwargs = {"headers": headers}
-                
-                # Determine body format
-                if config.content_type == "form":
-                    req_kwargs["data"] = payload
-                    # httpx sets content-type to application/x-www-form-urlencoded automatically when 'data' is used
-                else:
-                    req_kwargs["json"] = payload
+            client = get_http_client()
+            req_kwargs = {"headers": headers, "timeout": config.timeout}
+            
+            # Determine body format
+            if config.content_type == "form":
+                req_kwargs["data"] = payload
+                # httpx sets content-type to application/x-www-form-urlencoded automatically when 'data' is used
+            else:
+                req_kwargs["json"] = payload
 
-                if method == "POST":
-                    response = await client.post(url, **req_kwargs)
-                elif method == "GET":
-                    response = await client.get(url, params=payload, headers=headers)
-                elif method == "PUT":
-                    response = await client.put(url, **req_kwargs)
-                else:
-                    raise ValueError(f"Unsupported method {method}")
-                    
-                response.raise_for_status()
-                return {
-                    "status": "success",
-                    "code": response.status_code,
-                    "response": response.text
-                }
-        except Exception as e:
+            if method == "POST":
+                response = await client.post(url, **req_kwargs)
+            elif method == "GET":
+                response = await client.get(url, params=payload, headers=headers, timeout=config.timeout)
+            elif method == "PUT":
+                response = await client.put(url, **req_kwargs)
+            else:
+                raise ValueError(f"Unsupported method {method}")
+                
+            response.raise_for_status()
             return {
-                "status": "failed",
-                "error": str(e)
+                "status": "success",
+                "code": response.status_code,
+                "response": response.text
             }
+        except httpx.TimeoutException as e:
+            return DeliveryEngine._failure("timeout", e)
+        except httpx.HTTPStatusError as e:
+            return DeliveryEngine._failure("http_status", e, code=e.response.status_code)
+        except httpx.RequestError as e:
+            return DeliveryEngine._failure("transport", e)
+
+    @staticmethod
+    def _failure(error_class: str, error: Exception, **extra) -> Dict[str, Any]:
+        """
+        Failed-delivery result. error_class ("timeout", "http_status", "transport")
+        lets callers decide on retries without parsing the message.
+        """
+        return {
+            "status": "failed",
+            "error_class": error_class,
+            "error": str(error),
+            **extra
+        }
@@ -1,27 +1,33 @@
 from typing import List, Dict, Any
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
+from email.message import EmailMessage
+from email.utils import formataddr
 from pydantic import EmailStr
 from app.core.config import settings
+from app.core.smtp_pool import get_smtp_pool
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
-
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.SMTP_USER,
-    MAIL_PASSWORD=settings.SMTP_PASSWORD,
-    MAIL_FROM=settings.EMAILS_FROM_EMAIL,
-    MAIL_PORT=settings.SMTP_PORT,
-    MAIL_SERVER=settings.SMTP_SERVER,
-    MAIL_FROM_NAME=settings.EMAILS_FROM_NAME,
-    MAIL_STARTTLS=True,
-    MAIL_SSL_TLS=False,
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+
+# Setup Jinja2 environment. Templates ship with the code, so skip the per-render
+# mtime check (auto_reload) and keep compiled bytecode across worker restarts.
+template_env = Environment(
+    loader=FileSystemLoader(Path(__file__).parent.parent / "templates"),
+    auto_reload=False,
+    bytecode_cache=FileSystemBytecodeCache()
 )
 
-fastmail = FastMail(conf)
+# Compiled once at import; sends look templates up by name
+_TEMPLATES: Dict[str, Template] = {
+    name: template_env.get_template(name)
+    for name in template_env.list_templates(extensions=["html"])
+}
 
-# Setup Jinja2 environment
-template_env = Environment(loader=FileSystemLoader(Path(__file__).parent.parent / "templates"))
+def _build_message(recipients: List[str], subject: str, html_content: str) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = formataddr((settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL))
+    message["To"] = ", ".join(recipients)
+    message["Subject"] = subject
+    message.set_content(html_content, subtype="html")
+    return message
 
 async def send_email(
     to_email: str,
@@ -36,20 +42,15 @@ async def send_email(
         subject: Email subject
         html_content: HTML content of the email
     """
-    message = MessageSchema(
-        subject=subject,
-        recipients=[to_email],
-        body=html_content,
-        subtype=MessageType.html
-    )
-
     if not settings.SMTP_SERVER or not settings.SMTP_USER:
         print(f"MOCK EMAIL TO {to_email}: {subject}")
         print(f"Content: {html_content[:200]}...")
         return
 
+    message = _build_message([to_email], subject, html_content)
+
     try:
-        await fastmail.send_message(message)
+        await get_smtp_pool().send_message(message)
     except Exception as e:
         print(f"Error sending email: {e}")
         # In development, we can just log it and proceed
@@ -64,7 +65,7 @@ async def send_email_template(
     template_name: str,
     template_body: Dict[str, Any]
 ):
-    template = template_env.get_template(template_name)
+    template = _TEMPLATES.get(template_name) or template_env.get_template(template_name)
     
     # Add project_name to context if not present
     if "project_name" not in template_body:
@@ -72,19 +73,14 @@ async def send_email_template(
         
     html_content = template.render(**template_body)
 
-    message = MessageSchema(
-        subject=subject,
-        recipients=email_to,
-        body=html_content,
-        subtype=MessageType.html
-    )
-
     if not settings.SMTP_SERVER or not settings.SMTP_USER:
         print(f"MOCK EMAIL TO {email_to}: {subject} | LINK: {template_body.get('link')}")
         return
 
+    message = _build_message(email_to, subject, html_content)
+
     try:
-        await fastmail.send_message(message)
+        await get_smtp_pool().send_message(message)
     except Exception as e:
         print(f"Error sending email: {e}")
         # In development, we can just log it and proceed
@@ -92,7 +88,7 @@ async def send_email_template(
             return
         raise e
 
-async def send_verification_email(email_to: EmailStr, token: str):
+def send_verification_email(email_to: EmailStr, token: str):
     from app.tasks.email_tasks import send_email_task
     link = f"{settings.get_public_frontend_url}/verify-email?token={token}"
     send_email_task.delay(
@@ -106,7 +102,7 @@ async def send_verification_email(email_to: EmailStr, token: str):
         }
     )
 
-async def send_reset_password_email(email_to: EmailStr, token: str):
+def send_reset_password_email(email_to: EmailStr, token: str):
     from app.tasks.email_tasks import send_email_task
     link = f"{settings.get_public_frontend_url}/reset-password?token={token}"
     send_email_task.delay(
@@ -121,7 +117,7 @@ async def send_reset_password_email(email_to: EmailStr, token: str):
     )
 
 
-async def send_invitation_email(
+def send_invitation_email(
     email: str,
     full_name: str,
     invitation_token: str,
@@ -146,7 +142,7 @@ async def send_invitation_email(
     )
 
 
-async def send_destination_submitted_email(
+def send_destination_submitted_email(
     admin_email: str,
     admin_name: str,
     requester_email: str,
@@ -176,7 +172,7 @@ async def send_destination_submitted_email(
     )
 
 
-async def send_destination_approved_email(
+def send_destination_approved_email(
     requester_email: str,
     destination_name: str,
     approver_email: str
@@ -194,7 +190,7 @@ async def send_destination_approved_email(
     )
 
 
-async def send_destination_rejected_email(
+def send_destination_rejected_email(
     requester_email: str,
     destination_name: str,
     rejecter_email: str,
@@ -1,10 +1,58 @@
-from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
-from app.models.vendor import Source
-from app.models.mapping import SourceMapping
+from typing import Callable, Dict, Any, List, Optional, Set, Tuple
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+import operator
+import re
+import time
+from beanie import PydanticObjectId
+from app.core.redis_manager import get_cache_redis
+from app.models.vendor import Source, Vendor
+from app.models.mapping import MappingRule, SourceMapping
 from app.models.normalization import SourceNormalization
 from app.models.rules import SourceRules, RuleGroup, RuleCondition
 
+# Per-process throttle for Vendor.last_lead_at writes: {vendor_id: last write (monotonic)}
+LAST_LEAD_TOUCH_INTERVAL = 60
+_last_lead_touch: Dict[str, float] = {}
+
+# Per-process alias index used by apply_mapping:
+# {tenant_id: (expires_at, generation, system_field_keys, alias_map)}.
+# Edits bump a Redis generation counter so every worker drops its copy on the
+# next lead; the TTL bounds staleness if Redis is unavailable.
+ALIAS_CACHE_TTL = 60
+ALIAS_GENERATION_PREFIX = "systemfield_gen"
+_ALIAS_CACHE: Dict[str, Tuple[float, Optional[bytes], Set[str], Dict[str, List[Dict[str, Any]]]]] = {}
+
+# Normalization operations by rule.operation; other operations are stored but
+# not applied yet
+_NORMALIZATION_OPS: Dict[str, Callable[[str], str]] = {
+    "lowercase": str.lower,
+    "uppercase": str.upper,
+}
+
+def _normalizers_by_field(normalization: SourceNormalization) -> Dict[str, List[Callable[[str], str]]]:
+    """Applicable normalization ops per field, in rule order."""
+    by_field: Dict[str, List[Callable[[str], str]]] = defaultdict(list)
+    for rule in normalization.rules:
+        op = _NORMALIZATION_OPS.get(rule.operation)
+        if op is not None:
+            by_field[rule.field].append(op)
+    return by_field
+
+# Smart-match key normalization: lowercase, drop underscores and spaces
+_STRIP_TABLE = str.maketrans("", "", "_ ")
+
+@lru_cache(maxsize=4096)
+def _normalized_key(key: str) -> str:
+    """Rule fields and vendor payload keys repeat across leads, so memoize."""
+    return key.lower().translate(_STRIP_TABLE)
+
+@lru_cache(maxsize=1024)
+def _compile_regex(pattern: str) -> re.Pattern:
+    """Compiled rule regexes, kept independently of re's own small cache."""
+    return re.compile(pattern)
+
 class ProcessingEngine:
     @staticmethod
     async def process_record(payload: Dict[str, Any], source: Source, owner_id: str, tenant_id: str, vendor_id: Optional[str] = None) -> Dict[str, Any]:
@@ -15,11 +63,11 @@ class ProcessingEngine:
         3. Duplicate Check
         4. Rules (Filtering)
         """
-        # 1. Mapping
-        mapped_data = await ProcessingEngine.apply_mapping(payload, source.mapping, source.id, owner_id, tenant_id, vendor_id=vendor_id)
-        
-        # 2. Normalization
-        normalized_data = ProcessingEngine.apply_normalization(mapped_data, source.normalization)
+        # 1. Mapping + 2. Normalization (applied as mapped values are written)
+        normalized_data = await ProcessingEngine.apply_mapping(
+            payload, source.mapping, source.id, owner_id, tenant_id,
+            vendor_id=vendor_id, normalization=source.normalization
+        )
         
         # 3. Duplicate Check
         dupe_error = await ProcessingEngine.check_duplicate(normalized_data, source)
@@ -67,6 +115,7 @@ class ProcessingEngine:
         
         status = "processed"
         rejection_reason = None
+        is_duplicate = bool(dupe_error)
         
         if normalized_data.get("_rejected"):
             status = "rejected"
@@ -78,32 +127,63 @@ class ProcessingEngine:
         if "language" in normalized_data:
             normalized_data["source_language"] = normalized_data.pop("language")
             
-        # Also modify original_payload to prevent the same error (since it's also indexed)
-        # We create a shallow copy to verify we don't mutate input, though in this flow usage it is fine
-        final_payload = payload.copy()
-        if "language" in final_payload:
-            final_payload["source_language"] = final_payload.pop("language")
+        # Also modify original_payload to prevent the same error (since it's also indexed).
+        # The input is never mutated: it is only copied when the key has to move.
+        final_payload = payload
+        if "language" in payload:
+            final_payload = {k: v for k, v in payload.items() if k != "language"}
+            final_payload["source_language"] = payload["language"]
             
-        lead_doc = Lead(
-            owner_id=owner_id,
-            tenant_id=tenant_id,
-            vendor_id=vendor_id if vendor_id else "unknown",
-            source_id=source.id,
-            data=normalized_data,
-            original_payload=final_payload,
-            status=status,
-            rejection_reason=rejection_reason
-        )
-        await lead_doc.insert()
-        # Generate human-readable lead_id: LD-{last_6_chars_of_id_uppercase}
-        lead_doc.lead_id = f"LD-{str(lead_doc.id)[-6:].upper()}"
-        await lead_doc.save()
+        # Written as a raw document: every field is produced by this pipeline,
+        # so Beanie's validate/encode round trip is skipped. Keep the keys in
+        # step with the Lead model. The ObjectId is assigned client-side so the
+        # human-readable lead_id (LD-{last_6_chars_of_id_uppercase}) goes out
+        # with the insert.
+        lead_oid = PydanticObjectId()
+        lead_id = f"LD-{str(lead_oid)[-6:].upper()}"
+        created_at = datetime.now(timezone.utc)
+        await Lead.get_pymongo_collection().insert_one({
+            "_id": lead_oid,
+            "tenant_id": tenant_id,
+            "owner_id": owner_id,
+            "vendor_id": vendor_id if vendor_id else "unknown",
+            "source_id": source.id,
+            "lead_id": lead_id,
+            "external_id": None,
+            "data": normalized_data,
+            "original_payload": final_payload,
+            "status": status,
+            "rejection_reason": rejection_reason,
+            "is_duplicate": is_duplicate,
+            "routing_results": [],
+            "created_at": created_at,
+            "processed_at": None
+        })
+        
+        await ProcessingEngine.touch_vendor_last_lead(vendor_id, created_at)
         
-        normalized_data["_lead_id"] = str(lead_doc.id)
-        normalized_data["lead_id"] = lead_doc.lead_id
+        normalized_data["_lead_id"] = str(lead_oid)
+        normalized_data["lead_id"] = lead_id
             
         return normalized_data
 
+    @staticmethod
+    async def touch_vendor_last_lead(vendor_id: Optional[str], created_at: datetime):
+        """
+        Record that a vendor received a lead, at most once per interval per vendor,
+        so the per-lead ingest path does not turn into a vendor write per lead.
+        """
+        if not vendor_id or not PydanticObjectId.is_valid(vendor_id):
+            return
+        now = time.monotonic()
+        if now - _last_lead_touch.get(vendor_id, float("-inf")) < LAST_LEAD_TOUCH_INTERVAL:
+            return
+        _last_lead_touch[vendor_id] = now
+        await Vendor.get_pymongo_collection().update_one(
+            {"_id": PydanticObjectId(vendor_id)},
+            {"$max": {"last_lead_at": created_at}}
+        )
+
     @staticmethod
     async def check_duplicate(payload: Dict[str, Any], source: Source) -> Optional[str]:
         if not source.config.dupe_check:
@@ -130,65 +210,126 @@ class ProcessingEngine:
             main_query["created_at"] = {"$gte": start_time}
             
         from app.models.lead import Lead
-        existing = await Lead.find_one(main_query)
+        # Existence probe: only _id comes back, answered from the dupe indexes
+        existing = await Lead.get_pymongo_collection().find_one(main_query, {"_id": 1})
         if existing:
             return f"Duplicate lead found within {source.config.dupe_check_days} days" if source.config.dupe_check_days > 0 else "Duplicate lead found"
             
         return None
 
     @staticmethod
-    async def apply_mapping(payload: Dict[str, Any], mapping: SourceMapping, source_id: str, owner_id: str, tenant_id: str, vendor_id: Optional[str] = None, auto_discover: bool = True) -> Dict[str, Any]:
+    async def _alias_generation(tenant_id: str) -> Optional[bytes]:
+        try:
+            return await get_cache_redis().get(f"{ALIAS_GENERATION_PREFIX}:{tenant_id}")
+        except Exception as e:
+            print(f"Alias generation read failed: {e}")
+            return None
+
+    @staticmethod
+    async def get_alias_index(tenant_id: str) -> Tuple[Set[str], Dict[str, List[Dict[str, Any]]]]:
+        """
+        Return (system_field_keys, alias_map) for a tenant, rebuilt from
+        SystemField only when the cached copy expired or was invalidated.
+        Callers must treat both as read-only.
+        """
+        from app.models.system_field import SystemField
+
+        now = time.monotonic()
+        generation = await ProcessingEngine._alias_generation(tenant_id)
+        entry = _ALIAS_CACHE.get(tenant_id)
+        if entry and entry[0] > now and entry[1] == generation:
+            return entry[2], entry[3]
+
+        # Raw projected dicts: only field_key and aliases, no model validation
+        system_fields_docs = await SystemField.get_pymongo_collection().find(
+            {"tenant_id": tenant_id},
+            {"_id": 0, "field_key": 1, "aliases": 1}
+        ).to_list(None)
+        system_field_keys = {sf["field_key"] for sf in system_fields_docs}
+
+        alias_map = defaultdict(list)
+        for sf in system_fields_docs:
+            for alias_entry in sf.get("aliases") or []:
+                alias_map[alias_entry["alias_normalized"]].append({
+                    "target_key": sf["field_key"],
+                    "scope": alias_entry.get("scope", "source"),
+                    "owner_id": alias_entry.get("owner_id"),
+                    "vendor_id": alias_entry.get("vendor_id"),
+                    "source_id": alias_entry.get("source_id")
+                })
+
+        # Plain dict: lookups must not insert empty entries into the shared index
+        alias_map = dict(alias_map)
+        _ALIAS_CACHE[tenant_id] = (now + ALIAS_CACHE_TTL, generation, system_field_keys, alias_map)
+        return system_field_keys, alias_map
+
+    @staticmethod
+    async def invalidate_alias_cache(tenant_id: str):
+        """Drop a tenant's alias index in every process after its SystemFields change."""
+        _ALIAS_CACHE.pop(tenant_id, None)
+        try:
+            await get_cache_redis().incr(f"{ALIAS_GENERATION_PREFIX}:{tenant_id}")
+        except Exception as e:
+            print(f"Failed to invalidate alias cache: {e}")
+
+    @staticmethod
+    async def persist_rules(source_id: str, owner_id: str, rules: List[MappingRule]):
+        """
+        Append auto-discovered mapping rules to a source in a single $push,
+        skipping source fields that already have a rule.
+        """
+        try:
+            collection = Vendor.get_pymongo_collection()
+            vendor_doc = await collection.find_one(
+                {"sources.id": source_id, "owner_id": owner_id},
+                {"sources.$": 1}
+            )
+            if not vendor_doc:
+                return
+            # Check which source fields already have a rule
+            existing = {r.get("source_field") for r in vendor_doc["sources"][0].get("mapping", {}).get("rules", [])}
+            new_rules = [r.model_dump() for r in rules if r.source_field not in existing]
+            if new_rules:
+                await collection.update_one(
+                    {"_id": vendor_doc["_id"], "sources.id": source_id},
+                    {"$push": {"sources.$.mapping.rules": {"$each": new_rules}}}
+                )
+        except Exception as e:
+            print(f"Failed to auto-persist mapping rules: {e}")
+
+    @staticmethod
+    async def apply_mapping(payload: Dict[str, Any], mapping: SourceMapping, source_id: str, owner_id: str, tenant_id: str, vendor_id: Optional[str] = None, auto_discover: bool = True, normalization: Optional[SourceNormalization] = None) -> Dict[str, Any]:
         """
         Applies mapping rules to the payload.
         Uses scoped alias matching and normalization.
+        If `normalization` is given, its rules are applied to each value as it
+        is written (same result as apply_normalization on the output).
         """
-        from app.models.system_field import SystemField
         from app.services.unknown_field_service import UnknownFieldService
         
-        system_fields_docs = await SystemField.find(SystemField.tenant_id == tenant_id).to_list()
-        system_field_keys = {f.field_key for f in system_fields_docs}
-        mapped_source_fields = {r.source_field for r in mapping.rules}
-        
         result = {}
-        
-        alias_map = {} 
-        for sf in system_fields_docs:
-            for alias_entry in sf.aliases:
-                norm = alias_entry.alias_normalized
-                if norm not in alias_map:
-                    alias_map[norm] = []
-                alias_map[norm].append({
-                    "target_key": sf.field_key,
-                    "scope": alias_entry.scope,
-                    "owner_id": alias_entry.owner_id,
-                    "vendor_id": alias_entry.vendor_id,
-                    "source_id": alias_entry.source_id
-                })
+        normalizers = _normalizers_by_field(normalization) if normalization and normalization.rules else {}
 
-        async def persist_rule(s_id, src_field, tgt_field, o_id):
-            try:
-                from app.models.mapping import MappingRule
-                from app.models.vendor import Vendor
-                vendor_doc = await Vendor.find_one({"sources.id": s_id, "owner_id": o_id})
-                if vendor_doc:
-                    s_idx = next((i for i, s in enumerate(vendor_doc.sources) if s.id == s_id), None)
-                    if s_idx is not None:
-                        # Check if a rule for this source_field already exists
-                        exists = any(r.source_field == src_field for r in vendor_doc.sources[s_idx].mapping.rules)
-                        if not exists:
-                            vendor_doc.sources[s_idx].mapping.rules.append(
-                                MappingRule(source_field=src_field, target_field=tgt_field)
-                            )
-                            await vendor_doc.save()
-            except Exception as e:
-                print(f"Failed to auto-persist mapping rule: {e}")
+        def put(key: str, value: Any):
+            ops = normalizers.get(key)
+            if ops:
+                for op in ops:
+                    value = op(value if isinstance(value, str) else str(value))
+            result[key] = value
 
         if auto_discover:
+            system_field_keys, alias_map = await ProcessingEngine.get_alias_index(tenant_id)
+            mapped_source_fields = {r.source_field for r in mapping.rules}
+
+            # Auto-discovered rules and unknown fields are written once, after the loop
+            pending_rules: List[MappingRule] = []
+            unknown_fields: Dict[str, Any] = {}
+
             for key, value in payload.items():
                 if key in system_field_keys:
-                    result[key] = value
+                    put(key, value)
                     if key not in mapped_source_fields:
-                        await persist_rule(source_id, key, key, owner_id)
+                        pending_rules.append(MappingRule(source_field=key, target_field=key))
                         mapped_source_fields.add(key)
                     continue
 
@@ -218,21 +359,23 @@ class ProcessingEngine:
 
                 if target_sys_field:
                     # Found a match via alias!
-                    result[target_sys_field] = value
-                    await persist_rule(source_id, key, target_sys_field, owner_id)
+                    put(target_sys_field, value)
+                    pending_rules.append(MappingRule(source_field=key, target_field=target_sys_field))
                     mapped_source_fields.add(key)
                 else:
                     # Truly an unknown field
-                    await persist_rule(source_id, key, None, owner_id)
+                    pending_rules.append(MappingRule(source_field=key, target_field=None))
                     mapped_source_fields.add(key)
-                    await UnknownFieldService.track_unknown_field(source_id, key, value, owner_id, tenant_id)
+                    unknown_fields[key] = value
 
-        # Prepare normalized payload map for smart fallback
+            if pending_rules:
+                await ProcessingEngine.persist_rules(source_id, owner_id, pending_rules)
+            if unknown_fields:
+                await UnknownFieldService.track_unknown_fields(source_id, unknown_fields, owner_id, tenant_id)
+
+        # Normalized payload map for smart fallback, built on the first exact miss
         # Key: normalized key, Value: original key
-        # We only build this if necessary to save perf, but for simplicity/safety we build once
-        normalized_payload = {}
-        for k in payload.keys():
-            normalized_payload[k.lower().replace("_", "").replace(" ", "")] = k
+        normalized_payload = None
 
         for rule in mapping.rules:
             # 1. Exact Match
@@ -240,9 +383,10 @@ class ProcessingEngine:
             
             # 2. Smart Match Fallback
             if val is None:
+                if normalized_payload is None:
+                    normalized_payload = {_normalized_key(k): k for k in payload}
                 # Try to finding via normalized key
-                search_key_norm = rule.source_field.lower().replace("_", "").replace(" ", "")
-                found_key = normalized_payload.get(search_key_norm)
+                found_key = normalized_payload.get(_normalized_key(rule.source_field))
                 if found_key:
                     val = payload[found_key]
             
@@ -252,7 +396,7 @@ class ProcessingEngine:
             
             # 4. Apply to Result
             if val is not None and rule.target_field:
-                result[rule.target_field] = val
+                put(rule.target_field, val)
             elif rule.is_required:
                 # Log warning or track missing field
                 # For now just print/log, but we don't block unless we implement strict mode
@@ -266,57 +410,107 @@ class ProcessingEngine:
         if not normalization.rules:
             return payload
         for rule in normalization.rules:
-            if rule.field in payload:
-                val = payload[rule.field]
-                if rule.operation == "lowercase":
-                    payload[rule.field] = str(val).lower()
-                elif rule.operation == "uppercase":
-                    payload[rule.field] = str(val).upper()
+            op = _NORMALIZATION_OPS.get(rule.operation)
+            if op is None or rule.field not in payload:
+                continue
+            val = payload[rule.field]
+            payload[rule.field] = op(val if isinstance(val, str) else str(val))
         return payload
 
     @staticmethod
     def evaluate_rules(payload: Dict[str, Any], rules: SourceRules) -> bool:
         if not rules.filtering:
             return True
-        return ProcessingEngine.evaluate_group(payload, rules.filtering)
+        return ProcessingEngine.compile_rules(rules)(payload)
+
+    @staticmethod
+    def compile_rules(rules: SourceRules) -> Callable[[Dict[str, Any]], bool]:
+        """
+        Predicate for a rules tree. Sources and campaigns are re-read per
+        lead, so compiled trees are cached by their JSON rather than by object.
+        """
+        if not rules.filtering:
+            return _always_true
+        return _compile_filtering(rules.filtering.model_dump_json())
 
     @staticmethod
     def evaluate_group(payload: Dict[str, Any], group: RuleGroup) -> bool:
-        results = []
-        for condition in group.conditions:
-            if isinstance(condition, RuleGroup):
-                results.append(ProcessingEngine.evaluate_group(payload, condition))
-            elif isinstance(condition, RuleCondition):
-                results.append(ProcessingEngine.evaluate_condition(payload, condition))
-        
-        if not results:
-            return True
-        return all(results) if group.logic == "and" else any(results)
+        return _compile_group(group)(payload)
 
     @staticmethod
     def evaluate_condition(payload: Dict[str, Any], condition: RuleCondition) -> bool:
-        field_val = payload.get(condition.field)
-        target_val = condition.value
-        
-        if condition.op == "eq": return str(field_val) == str(target_val)
-        if condition.op == "neq": return str(field_val) != str(target_val)
-        if condition.op == "gt":
-            try: return float(field_val) > float(target_val)
-            except: return False
-        if condition.op == "lt":
-            try: return float(field_val) < float(target_val)
-            except: return False
-        if condition.op == "gte":
-            try: return float(field_val) >= float(target_val)
-            except: return False
-        if condition.op == "lte":
-            try: return float(field_val) <= float(target_val)
-            except: return False
-        if condition.op == "in": return field_val in target_val if isinstance(target_val, list) else str(field_val) in str(target_val)
-        if condition.op == "nin": return field_val not in target_val if isinstance(target_val, list) else str(field_val) not in str(target_val)
-        if condition.op == "contains": return str(target_val).lower() in str(field_val).lower()
-        if condition.op == "regex":
-            import re
-            try: return bool(re.search(str(target_val), str(field_val)))
-            except: return False
-        return True
+        return _compile_condition(condition)(payload)
+
+
+def _always_true(payload: Dict[str, Any]) -> bool:
+    return True
+
+def _always_false(payload: Dict[str, Any]) -> bool:
+    return False
+
+_NUMERIC_OPS = {"gt": operator.gt, "lt": operator.lt, "gte": operator.ge, "lte": operator.le}
+
+def _compile_condition(condition: RuleCondition) -> Callable[[Dict[str, Any]], bool]:
+    """Bind one condition's op and target value into a closure over the payload."""
+    field = condition.field
+    op = condition.op
+    target_val = condition.value
+
+    if op in ("eq", "neq"):
+        target_str = str(target_val)
+        negate = op == "neq"
+        def equals(p: Dict[str, Any]) -> bool:
+            val = p.get(field)
+            return ((val if isinstance(val, str) else str(val)) == target_str) != negate
+        return equals
+
+    if op in _NUMERIC_OPS:
+        compare = _NUMERIC_OPS[op]
+        try:
+            target_num = float(target_val)
+        except (TypeError, ValueError):
+            return _always_false
+        def numeric(p: Dict[str, Any]) -> bool:
+            val = p.get(field)
+            # JSON numbers arrive as int/float and compare as-is; strings are parsed
+            if isinstance(val, (int, float)):
+                return compare(val, target_num)
+            try: return compare(float(val), target_num)
+            except (TypeError, ValueError): return False
+        return numeric
+
+    if op in ("in", "nin"):
+        negate = op == "nin"
+        if isinstance(target_val, list):
+            return lambda p: (p.get(field) in target_val) != negate
+        target_str = str(target_val)
+        return lambda p: (str(p.get(field)) in target_str) != negate
+
+    if op == "contains":
+        needle = str(target_val).lower()
+        return lambda p: needle in str(p.get(field)).lower()
+
+    if op == "regex":
+        try:
+            pattern = _compile_regex(str(target_val))
+        except re.error:
+            return _always_false
+        return lambda p: bool(pattern.search(str(p.get(field))))
+
+    return _always_true
+
+def _compile_group(group: RuleGroup) -> Callable[[Dict[str, Any]], bool]:
+    checks = [
+        _compile_group(condition) if isinstance(condition, RuleGroup) else _compile_condition(condition)
+        for condition in group.conditions
+        if isinstance(condition, (RuleGroup, RuleCondition))
+    ]
+    if not checks:
+        return _always_true
+    if group.logic == "and":
+        return lambda p: all(check(p) for check in checks)
+    return lambda p: any(check(p) for check in checks)
+
+@lru_cache(maxsize=1024)
+def _compile_filtering(filtering_json: str) -> Callable[[Dict[str, Any]], bool]:
+    return _compile_group(RuleGroup.model_validate_json(filtering_json))
@@ -6,6 +6,7 @@ from app.models.lead import Lead, RoutingResult
 from app.models.customer import Customer, Destination
 from app.models.campaign import Campaign
 from app.services.processing_engine import ProcessingEngine
+from app.core.http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -150,55 +151,55 @@ class RoutingEngine:
         error_message = None
         
         try:
-            async with httpx.AsyncClient() as client:
-                config = destination.config
-                
-                # Setup request
-                req_kwargs = {
-                    "headers": config.headers.copy(),
-                    "timeout": config.timeout
-                }
+            client = get_http_client()
+            config = destination.config
+            
+            # Setup request
+            req_kwargs = {
+                "headers": config.headers.copy(),
+                "timeout": config.timeout
+            }
 
-                # Determine how to send data
-                if config.method == "GET":
-                    req_kwargs["params"] = outbound_data
-                elif config.content_type == "form":
-                    req_kwargs["data"] = outbound_data
-                else:
-                    req_kwargs["json"] = outbound_data
+            # Determine how to send data
+            if config.method == "GET":
+                req_kwargs["params"] = outbound_data
+            elif config.content_type == "form":
+                req_kwargs["data"] = outbound_data
+            else:
+                req_kwargs["json"] = outbound_data
 
-                # Authentication handling (basic/bearer)
-                if config.auth_type == "bearer" and "token" in config.auth_credentials:
-                    req_kwargs["headers"]["Authorization"] = f"Bearer {config.auth_credentials['token']}"
-                elif config.auth_type == "basic" and "username" in config.auth_credentials:
-                    req_kwargs["auth"] = (config.auth_credentials["username"], config.auth_credentials.get("password", ""))
+            # Authentication handling (basic/bearer)
+            if config.auth_type == "bearer" and "token" in config.auth_credentials:
+                req_kwargs["headers"]["Authorization"] = f"Bearer {config.auth_credentials['token']}"
+            elif config.auth_type == "basic" and "username" in config.auth_credentials:
+                req_kwargs["auth"] = (config.auth_credentials["username"], config.auth_credentials.get("password", ""))
 
-                # Log before sending
-                if config.method == "GET":
-                    # Correctly merge params for logging and request
-                    url_obj = httpx.URL(config.url)
-                    merged_params = url_obj.params.merge(outbound_data)
-                    final_url = url_obj.copy_with(params=merged_params)
-                    
-                    # Update req_kwargs to use the merged params with the clean base URL
-                    # This ensures what we log is exactly what we send
-                    req_kwargs["params"] = merged_params
-                    # We strip the query from the URL passed to request() since we pass it in params
-                    # actually httpx handles it, but explicit is better for clarity here
-                    
-                    logger.info(f"Delivering to campaign {campaign.name} [GET] - Full URL: {final_url}")
-                else:
-                    logger.info(f"Delivering to campaign {campaign.name} [{config.method}] - URL: {config.url}")
-                    logger.info(f"Payload ({config.content_type}): {outbound_data}")
+            # Log before sending
+            if config.method == "GET":
+                # Correctly merge params for logging and request
+                url_obj = httpx.URL(config.url)
+                merged_params = url_obj.params.merge(outbound_data)
+                final_url = url_obj.copy_with(params=merged_params)
                 
-                # If we merged params manually for GET, we strictly don't need to change config.url passed to client,
-                # but to avoid double-merging confusion (though safe), let's just rely on httpx merging behavior 
-                # OR pass the already param-stripped URL. 
-                # Safest: Use config.url (httpx merges) and just trust our log which uses .merge() logic consistent with httpx.
-                
-                response = await client.request(config.method, config.url, **req_kwargs)
-                response.raise_for_status()
+                # Update req_kwargs to use the merged params with the clean base URL
+                # This ensures what we log is exactly what we send
+                req_kwargs["params"] = merged_params
+                # We strip the query from the URL passed to request() since we pass it in params
+                # actually httpx handles it, but explicit is better for clarity here
                 
+                logger.info(f"Delivering to campaign {campaign.name} [GET] - Full URL: {final_url}")
+            else:
+                logger.info(f"Delivering to campaign {campaign.name} [{config.method}] - URL: {config.url}")
+                logger.info(f"Payload ({config.content_type}): {outbound_data}")
+            
+            # If we merged params manually for GET, we strictly don't need to change config.url passed to client,
+            # but to avoid double-merging confusion (though safe), let's just rely on httpx merging behavior 
+            # OR pass the already param-stripped URL. 
+            # Safest: Use config.url (httpx merges) and just trust our log which uses .merge() logic consistent with httpx.
+            
+            response = await client.request(config.method, config.url, **req_kwargs)
+            response.raise_for_status()
+            
         except Exception as e:
             logger.error(f"Delivery failed for campaign {campaign.name}: {e}")
             status = "failed"
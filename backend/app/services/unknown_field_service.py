@@ -1,10 +1,20 @@
 import re
 from datetime import datetime
-from typing import Optional, Any, Literal
+from typing import Optional, Any, Dict, Literal
+from beanie import PydanticObjectId
+from pymongo import UpdateOne
+from pydantic import BaseModel, Field
 from app.models.unknown_field import UnknownField
 from app.models.system_field import SystemField, AliasEntry
 from app.models.vendor import Vendor, Source
 
+class UnknownFieldSeenView(BaseModel):
+    """Projection for track_unknown_field(s): only what the per-lead update reads."""
+    id: PydanticObjectId = Field(alias="_id")
+    field_name: str
+    status: str
+    sample_value: Optional[str] = None
+
 class UnknownFieldService:
     @staticmethod
     def normalize_alias(val: str) -> str:
@@ -13,6 +23,24 @@ class UnknownFieldService:
         # Lowercase, trim, remove all non-alphanumeric
         return re.sub(r'[^a-z0-9]', '', val.lower().strip())
 
+    @staticmethod
+    def _seen_update(unknown: UnknownFieldSeenView, sample_str: Optional[str]) -> dict:
+        # Targeted update instead of hydrating + save(): $inc also keeps the
+        # count exact when several workers see the same field at once
+        update = {"$inc": {"detected_count": 1}, "$set": {"last_seen": datetime.utcnow()}}
+        
+        # Append new sample value if valid and different
+        if sample_str:
+            current_samples = unknown.sample_value.split(", ") if unknown.sample_value else []
+            # Keep only last 5 distinct values to avoid bloating
+            if sample_str not in current_samples:
+                current_samples.append(sample_str)
+                # Limit to last 5
+                if len(current_samples) > 5:
+                    current_samples = current_samples[-5:]
+                update["$set"]["sample_value"] = ", ".join(current_samples)
+        return update
+
     @staticmethod
     async def track_unknown_field(source_id: str, field_name: str, sample_value: Any, owner_id: str, tenant_id: str) -> None:
         """
@@ -25,28 +53,16 @@ class UnknownFieldService:
         # Database lookup by field_name and tenant_id (and owner_id for safety)
         unknown = await UnknownField.find_one(
             UnknownField.field_name == field_name,
-            UnknownField.tenant_id == tenant_id
+            UnknownField.tenant_id == tenant_id,
+            projection_model=UnknownFieldSeenView
         )
         
         if unknown:
             if unknown.status == "ignored":
                 return
-            
-            unknown.detected_count += 1
-            unknown.last_seen = datetime.utcnow()
-            
-            # Append new sample value if valid and different
-            if sample_str:
-                current_samples = unknown.sample_value.split(", ") if unknown.sample_value else []
-                # Keep only last 5 distinct values to avoid bloating
-                if sample_str not in current_samples:
-                    current_samples.append(sample_str)
-                    # Limit to last 5
-                    if len(current_samples) > 5:
-                        current_samples = current_samples[-5:]
-                    unknown.sample_value = ", ".join(current_samples)
-            
-            await unknown.save()
+            await UnknownField.get_pymongo_collection().update_one(
+                {"_id": unknown.id}, UnknownFieldService._seen_update(unknown, sample_str)
+            )
         else:
             await UnknownField(
                 owner_id=owner_id,
@@ -58,6 +74,44 @@ class UnknownFieldService:
                 status="unmapped"
             ).insert()
 
+    @staticmethod
+    async def track_unknown_fields(source_id: str, fields: Dict[str, Any], owner_id: str, tenant_id: str) -> None:
+        """
+        Batch form of track_unknown_field for all unknown keys of one payload:
+        one lookup, one bulk update and one insert_many instead of a round
+        trip per field.
+        """
+        seen = {
+            uf.field_name: uf
+            for uf in await UnknownField.find(
+                {"field_name": {"$in": list(fields)}, "tenant_id": tenant_id},
+                projection_model=UnknownFieldSeenView
+            ).to_list()
+        }
+        
+        updates = []
+        new_fields = []
+        for field_name, sample_value in fields.items():
+            sample_str = str(sample_value) if sample_value is not None else None
+            unknown = seen.get(field_name)
+            if unknown is None:
+                new_fields.append(UnknownField(
+                    owner_id=owner_id,
+                    tenant_id=tenant_id,
+                    source_id=source_id,
+                    field_name=field_name,
+                    sample_value=sample_str,
+                    detected_count=1,
+                    status="unmapped"
+                ))
+            elif unknown.status != "ignored":
+                updates.append(UpdateOne({"_id": unknown.id}, UnknownFieldService._seen_update(unknown, sample_str)))
+        
+        if updates:
+            await UnknownField.get_pymongo_collection().bulk_write(updates, ordered=False)
+        if new_fields:
+            await UnknownField.insert_many(new_fields)
+
     @staticmethod
     async def map_unknown_field(
         source_id: str, 
@@ -216,12 +270,16 @@ class UnknownFieldService:
                 )
                 sys_field_doc.aliases.append(new_alias)
                 await sys_field_doc.save()
+
+        # New field and/or alias: workers must rebuild their alias index
+        from app.services.processing_engine import ProcessingEngine
+        await ProcessingEngine.invalidate_alias_cache(tenant_id)
             
         # 6. Trigger Retroactive Processing
         if affected_source_ids:
             from app.tasks.lead_tasks import reprocess_source_leads_task
-            for sid in affected_source_ids:
-                 reprocess_source_leads_task.delay(sid, tenant_id)
+            from app.core.celery_app import bulk_send
+            bulk_send([reprocess_source_leads_task.s(sid, tenant_id) for sid in affected_source_ids])
 
         return {"status": "success", "field": target_system_field, "affected_sources": len(affected_source_ids)}
 
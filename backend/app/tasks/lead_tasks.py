@@ -20,9 +20,11 @@ async def ensure_db():
     global _db_initialized
     if not _db_initialized:
         from app.core.db import init_db
+        from app.core.redis_manager import redis_manager
         try:
             logger.info("Initializing DB connection for task...")
             await init_db()
+            await redis_manager.init_all()
             _db_initialized = True
             logger.info("DB connection initialized successfully.")
         except Exception as e:
@@ -41,7 +43,9 @@ def run_async(coro):
         return asyncio.ensure_future(coro, loop=loop)
     return loop.run_until_complete(coro)
 
-@celery_app.task(name="app.tasks.lead_tasks.process_lead_task")
+# Raw vendor payloads may hold integers beyond 64 bits, which orjson can't
+# round-trip; stdlib json keeps them exact
+@celery_app.task(name="app.tasks.lead_tasks.process_lead_task", serializer="json")
 def process_lead_task(payload: Dict[str, Any], source_id: str, vendor_id: str, owner_id: str, tenant_id: str):
     """
     Background task to process an ingested lead.
@@ -50,22 +54,23 @@ def process_lead_task(payload: Dict[str, Any], source_id: str, vendor_id: str, o
     
     async def _process():
         await ensure_db()
-        from app.models.vendor import Vendor
-        from app.utils.cache import invalidate_cache
+        from beanie import PydanticObjectId
+        from app.models.vendor import Vendor, Source
         from app.services.processing_engine import ProcessingEngine
         from app.services.analytics import AnalyticsEngine
 
-        # 1. Fetch source/vendor
-        vendor = await Vendor.get(vendor_id)
-        if not vendor:
-            logger.error(f"Vendor {vendor_id} not found")
-            return
-        
-        source = next((s for s in vendor.sources if s.id == source_id), None)
-        if not source:
+        # 1. Fetch only the matching source ("sources.$" projection), so the
+        # vendor's other sources are neither transferred nor validated
+        vendor_doc = await Vendor.get_pymongo_collection().find_one(
+            {"_id": PydanticObjectId(vendor_id), "sources.id": source_id},
+            {"sources.$": 1}
+        )
+        if not vendor_doc:
             logger.error(f"Source {source_id} not found in vendor {vendor_id}")
             return
         
+        source = Source.model_validate(vendor_doc["sources"][0])
+        
         # 2. Process through engine
         processed_data = await ProcessingEngine.process_record(payload, source, owner_id, tenant_id, vendor_id=vendor_id)
         
@@ -73,11 +78,13 @@ def process_lead_task(payload: Dict[str, Any], source_id: str, vendor_id: str, o
         if not processed_data.get("_rejected") and processed_data.get("_lead_id"):
             route_lead_task.delay(processed_data["_lead_id"])
             
-        # 4. Log Event
+        # 4. Log Event (the event buffer drops the tenant's cached dashboard
+        # stats once the batch holding this event is written)
         await AnalyticsEngine.log_event(
             "ingest",
             source.id,
             owner_id=owner_id,
+            tenant_id=tenant_id,
             vendor_id=vendor_id,
             meta={
                 "status": "processed" if not processed_data.get("_rejected") else "rejected",
@@ -86,10 +93,6 @@ def process_lead_task(payload: Dict[str, Any], source_id: str, vendor_id: str, o
             }
         )
         
-        # 5. Invalidate analytics cache so dashboard updates immediately
-        await invalidate_cache(f"fastapi-cache:*:{owner_id}:/api/v1/analytics/stats:*")
-        logger.info(f"Invalidated analytics cache for user {owner_id}")
-        
     return run_async(_process())
 
 @celery_app.task(name="app.tasks.lead_tasks.route_lead_task")
@@ -107,7 +110,7 @@ def route_lead_task(lead_id: str):
     return run_async(_route())
 
 @celery_app.task(name="app.tasks.lead_tasks.log_event_task")
-def log_event_task(event_type: str, source_id: str, owner_id: str, vendor_id: str, meta: Dict[str, Any]):
+def log_event_task(event_type: str, source_id: str, owner_id: str, vendor_id: str, meta: Dict[str, Any], tenant_id: Optional[str] = None):
     """
     Background task for logging analytics events.
     """
@@ -118,6 +121,7 @@ def log_event_task(event_type: str, source_id: str, owner_id: str, vendor_id: st
             event_type,
             source_id,
             owner_id=owner_id,
+            tenant_id=tenant_id,
             vendor_id=vendor_id,
             meta=meta
         )
@@ -155,20 +159,18 @@ def reprocess_source_leads_task(source_id: str, tenant_id: str):
                 if not lead.original_payload:
                     continue
                     
-                # 3. Re-Map
-                mapped = await ProcessingEngine.apply_mapping(
+                # 3. Re-Map + 4. Re-Normalize
+                normalized = await ProcessingEngine.apply_mapping(
                     lead.original_payload, 
                     source.mapping, 
                     source.id, 
                     lead.owner_id, 
                     lead.tenant_id,
                     vendor_id=str(vendor.id),
-                    auto_discover=False # Don't create new rules during reprocessing
+                    auto_discover=False, # Don't create new rules during reprocessing
+                    normalization=source.normalization
                 )
                 
-                # 4. Re-Normalize
-                normalized = ProcessingEngine.apply_normalization(mapped, source.normalization)
-                
                 # 5. Update Lead
                 # Preserve system fields if needed, but here we are fully resetting 'data' 
                 # based on current config + original payload.
@@ -221,3 +223,65 @@ def cleanup_old_payloads_task():
             logger.error(f"Failed to cleanup old payloads: {e}")
 
     return run_async(_cleanup())
+
+@celery_app.task(name="app.tasks.lead_tasks.rollup_lead_daily_stats_task")
+def rollup_lead_daily_stats_task(days: int = 2):
+    """
+    Background task to materialize per-vendor per-day lead counts into lead_daily_stats.
+    Rolls up the last `days` complete UTC days; past days are immutable, so
+    vendor history reads only need to aggregate the live tail.
+    Run with a larger `days` once to backfill.
+    """
+    logger.info(f"Rolling up lead daily stats for the last {days} days")
+    
+    async def _rollup():
+        await ensure_db()
+        from app.models.lead import Lead
+        from app.models.lead_daily_stats import LeadDailyStats
+        from datetime import datetime, timedelta
+        
+        now = datetime.utcnow()
+        end = datetime(now.year, now.month, now.day)
+        start = end - timedelta(days=days)
+        
+        pipeline = [
+            {"$match": {"created_at": {"$gte": start, "$lt": end}}},
+            {
+                "$group": {
+                    "_id": {
+                        "tenant_id": "$tenant_id",
+                        "vendor_id": "$vendor_id",
+                        "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}}
+                    },
+                    "leads": {"$sum": {"$cond": [{"$eq": ["$status", "processed"]}, 1, 0]}},
+                    "duplicates": {"$sum": {"$cond": [{"$eq": ["$is_duplicate", True]}, 1, 0]}}
+                }
+            },
+            {
+                "$project": {
+                    "_id": 0,
+                    "tenant_id": "$_id.tenant_id",
+                    "vendor_id": "$_id.vendor_id",
+                    "date": "$_id.date",
+                    "leads": 1,
+                    "duplicates": 1,
+                    "updated_at": "$$NOW"
+                }
+            },
+            {
+                "$merge": {
+                    "into": LeadDailyStats.Settings.name,
+                    "on": ["tenant_id", "vendor_id", "date"],
+                    "whenMatched": "replace",
+                    "whenNotMatched": "insert"
+                }
+            }
+        ]
+        
+        try:
+            await Lead.get_pymongo_collection().aggregate(pipeline).to_list(None)
+            logger.info(f"Lead daily stats rolled up for {start.date().isoformat()} to {end.date().isoformat()}")
+        except Exception as e:
+            logger.error(f"Failed to roll up lead daily stats: {e}")
+
+    return run_async(_rollup())
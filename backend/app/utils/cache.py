@@ -1,17 +1,33 @@
-import json
+import msgpack
 import functools
 import hashlib
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Optional, Union
 from fastapi import Request, Response
 from app.core.redis_manager import get_cache_redis
 from app.core.config import settings
+from app.utils.cache_tags import tenant_tag
 import logging
 import time
 
 logger = logging.getLogger(__name__)
 
-# Cache version for schema changes
-CACHE_VERSION = "v1"
+# Cache version for schema changes (v2: msgpack-encoded values)
+CACHE_VERSION = "v2"
+
+
+async def cache_set(key: str, value: Any, ttl: int):
+    """Store a JSON-compatible value as msgpack bytes."""
+    redis = get_cache_redis()
+    await redis.set(key, msgpack.packb(value, use_bin_type=True), ex=ttl)
+
+
+async def cache_get(key: str) -> Any:
+    """Read a msgpack value stored by cache_set (None on miss)."""
+    redis = get_cache_redis()
+    data = await redis.get(key)
+    if data is None:
+        return None
+    return msgpack.unpackb(data, raw=False)
 
 class CacheMetrics:
     """Track cache performance metrics"""
@@ -49,7 +65,7 @@ class CacheMetrics:
         cls.misses = 0
         cls.errors = 0
 
-def cache(ttl: int = None, key_prefix: str = "fastapi-cache", tags: list[str] = None):
+def cache(ttl: int = None, key_prefix: str = "fastapi-cache", tags: list[str] = None, tenant_scoped: bool = False):
     """
     Enhanced Redis caching decorator with metrics and tags.
     
@@ -57,6 +73,8 @@ def cache(ttl: int = None, key_prefix: str = "fastapi-cache", tags: list[str] =
         ttl: Time to live in seconds (uses CACHE_DEFAULT_TTL if None)
         key_prefix: Prefix for cache keys
         tags: List of tags for grouped invalidation
+        tenant_scoped: Share entries across all users of a tenant; tags are
+            suffixed with the tenant id (see cache_tags.tenant_tag)
     """
     if ttl is None:
         ttl = settings.CACHE_DEFAULT_TTL
@@ -84,8 +102,12 @@ def cache(ttl: int = None, key_prefix: str = "fastapi-cache", tags: list[str] =
 
             # Generate unique cache key
             user_id = "anonymous"
+            entry_tags = tags
             current_user = kwargs.get("current_user")
-            if current_user and hasattr(current_user, "id"):
+            if tenant_scoped and current_user and getattr(current_user, "tenant_id", None):
+                user_id = f"tenant:{current_user.tenant_id}"
+                entry_tags = [tenant_tag(tag, current_user.tenant_id) for tag in tags or []]
+            elif current_user and hasattr(current_user, "id"):
                 user_id = str(current_user.id)
             
             # Build key from URL and params
@@ -97,18 +119,18 @@ def cache(ttl: int = None, key_prefix: str = "fastapi-cache", tags: list[str] =
             # Include cache version in key
             cache_key = f"{key_prefix}:{CACHE_VERSION}:{user_id}:{url_path}:{params_hash}"
             
-            redis = await get_cache_redis()
+            redis = get_cache_redis()
             
             # Try to get from cache
             start_time = time.time()
             try:
-                cached_data = await redis.get(f"cache:{cache_key}")
-                if cached_data:
+                cached_data = await cache_get(f"cache:{cache_key}")
+                if cached_data is not None:
                     CacheMetrics.record_hit()
                     if settings.ENABLE_CACHE_LOGGING:
                         elapsed = (time.time() - start_time) * 1000
                         logger.info(f"✅ Cache HIT [{elapsed:.2f}ms]: {cache_key[:80]}...")
-                    return json.loads(cached_data)
+                    return cached_data
             except Exception as e:
                 CacheMetrics.record_error()
                 logger.error(f"❌ Redis cache read error: {e}")
@@ -126,21 +148,17 @@ def cache(ttl: int = None, key_prefix: str = "fastapi-cache", tags: list[str] =
                 serializable_result = jsonable_encoder(result)
                 
                 # Store the cached value
-                await redis.setex(
-                    f"cache:{cache_key}",
-                    ttl,
-                    json.dumps(serializable_result)
-                )
+                await cache_set(f"cache:{cache_key}", serializable_result, ttl)
                 
                 # Store tags for this cache key (if provided)
-                if tags:
-                    for tag in tags:
+                if entry_tags:
+                    for tag in entry_tags:
                         tag_key = f"tag:{tag}"
                         await redis.sadd(tag_key, f"cache:{cache_key}")
                         await redis.expire(tag_key, ttl + 300)  # Tags live slightly longer
                 
                 if settings.ENABLE_CACHE_LOGGING:
-                    logger.debug(f"💾 Cached with TTL={ttl}s, tags={tags}")
+                    logger.debug(f"💾 Cached with TTL={ttl}s, tags={entry_tags}")
                     
             except Exception as e:
                 CacheMetrics.record_error()
@@ -150,19 +168,31 @@ def cache(ttl: int = None, key_prefix: str = "fastapi-cache", tags: list[str] =
         return wrapper
     return decorator
 
-async def invalidate_cache(key_pattern: str):
+async def invalidate_cache(key_pattern: Union[str, list[str]]):
     """
-    Invalidate cache keys matching a pattern.
+    Invalidate cache keys matching one or more patterns.
+    
+    All pattern lookups are sent in a single pipeline followed by one DEL,
+    so invalidating several patterns costs two round trips.
     
     Args:
-        key_pattern: Pattern to match (e.g., "fastapi-cache:user123:*")
+        key_pattern: Pattern or list of patterns to match (e.g., "fastapi-cache:user123:*")
     """
-    redis = await get_cache_redis()
+    patterns = [key_pattern] if isinstance(key_pattern, str) else list(key_pattern)
+    if not patterns:
+        return
+    
+    redis = get_cache_redis()
     try:
-        keys = await redis.keys(f"cache:{key_pattern}*")
+        async with redis.pipeline(transaction=False) as pipe:
+            for pattern in patterns:
+                pipe.keys(f"cache:{pattern}*")
+            matches = await pipe.execute()
+        
+        keys = {key for found in matches for key in found}
         if keys:
             await redis.delete(*keys)
-            logger.info(f"🗑️ Invalidated {len(keys)} cache keys matching: {key_pattern}")
+            logger.info(f"🗑️ Invalidated {len(keys)} cache keys matching: {patterns}")
     except Exception as e:
         logger.error(f"Failed to invalidate cache: {e}")
 
@@ -173,7 +203,7 @@ async def invalidate_by_tags(tags: list[str]):
     Args:
         tags: List of tags to invalidate
     """
-    redis = await get_cache_redis()
+    redis = get_cache_redis()
     try:
         total_invalidated = 0
         for tag in tags:
@@ -197,10 +227,12 @@ async def get_cache_metrics() -> dict:
     app_metrics = CacheMetrics.get_stats()
     
     # Get Redis stats
-    redis = await get_cache_redis()
+    redis = get_cache_redis()
     try:
-        info = await redis.info("stats")
-        memory = await redis.info("memory")
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.info("stats")
+            pipe.info("memory")
+            info, memory = await pipe.execute()
         
         redis_metrics = {
             "keyspace_hits": info.get("keyspace_hits", 0),
@@ -34,6 +34,10 @@ def system_fields_list_tag() -> str:
     return f"{TAG_SYSTEM_FIELDS}:{TAG_LIST}"
 
 # Tag helpers
+def tenant_tag(tag: str, tenant_id: str) -> str:
+    """Scope a tag to a single tenant"""
+    return f"{tag}:tenant:{tenant_id}"
+
 def get_entity_tags(entity_type: str, entity_id: str = None) -> list[str]:
     """Get all tags for an entity"""
     tags = [entity_type]
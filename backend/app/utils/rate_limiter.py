@@ -31,7 +31,7 @@ class RateLimiter:
         if not settings.RATE_LIMIT_ENABLED:
             return True, {"remaining": max_requests, "reset": 0}
         
-        redis = await get_cache_redis()
+        redis = get_cache_redis()
         key = f"{redis_key_prefix}:{identifier}"
         
         try:
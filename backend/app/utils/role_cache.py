@@ -0,0 +1,86 @@
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from beanie import PydanticObjectId
+from app.core.redis_manager import get_cache_redis
+from app.models.role import Role as RoleDocument
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Role edits bump a per-role Redis generation counter, which every process
+# checks on an L1 hit, so a revoked permission stops applying on the next
+# request. If Redis is unavailable the TTL bounds how long L1 stays stale.
+ROLE_CACHE_TTL = 30
+ROLE_CACHE_PREFIX = "role_perms"
+ROLE_GENERATION_PREFIX = "role_gen"
+
+# L1: per-process {role_id: (expires_at, generation, permissions)}
+_local_cache: Dict[str, Tuple[float, Optional[bytes], List[str]]] = {}
+
+
+class RolePermissionsView(BaseModel):
+    """Projection used to fetch only a role's permissions."""
+    permissions: List[str] = []
+
+
+async def get_custom_role_permissions(role_id: str) -> Optional[List[str]]:
+    """
+    Get the permissions of a custom role, or None if the role does not exist.
+
+    Lookup order: in-process dict (L1) -> Redis (L2) -> MongoDB (projected).
+    The role's generation is fetched together with L2, and an L1 entry is only
+    used while its generation still matches.
+    """
+    if not PydanticObjectId.is_valid(role_id):
+        return None
+
+    now = time.monotonic()
+    redis_key = f"{ROLE_CACHE_PREFIX}:{role_id}"
+    try:
+        redis = get_cache_redis()
+        generation, cached = await redis.mget(f"{ROLE_GENERATION_PREFIX}:{role_id}", redis_key)
+    except Exception as e:
+        redis = None
+        generation = cached = None
+        logger.error(f"Role cache read error: {e}")
+
+    entry = _local_cache.get(role_id)
+    if entry and entry[0] > now and entry[1] == generation:
+        return entry[2]
+
+    if cached is not None:
+        permissions = json.loads(cached)
+        _local_cache[role_id] = (now + ROLE_CACHE_TTL, generation, permissions)
+        return permissions
+
+    role = await RoleDocument.find_one(
+        RoleDocument.id == PydanticObjectId(role_id)
+    ).project(RolePermissionsView)
+    if role is None:
+        return None
+
+    _local_cache[role_id] = (now + ROLE_CACHE_TTL, generation, role.permissions)
+    if redis is not None:
+        try:
+            await redis.setex(redis_key, ROLE_CACHE_TTL, json.dumps(role.permissions))
+        except Exception as e:
+            logger.error(f"Role cache write error: {e}")
+    return role.permissions
+
+
+async def invalidate_role_cache(role_id: str):
+    """
+    Drop a role from both cache levels after it is updated or deleted, and bump
+    its generation so other processes discard their L1 copy.
+    """
+    _local_cache.pop(role_id, None)
+    try:
+        redis = get_cache_redis()
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.incr(f"{ROLE_GENERATION_PREFIX}:{role_id}")
+            pipe.delete(f"{ROLE_CACHE_PREFIX}:{role_id}")
+            await pipe.execute()
+    except Exception as e:
+        logger.error(f"Failed to invalidate role cache: {e}")
@@ -1,4 +1,5 @@
 import asyncio
+from celery.signals import worker_process_shutdown
 from app.core.celery_app import celery_app
 from app.core.db import init_db
 import logging
@@ -13,3 +14,9 @@ logger.info("Celery worker starting...")
 # Import tasks so they are registered
 import app.tasks.lead_tasks
 import app.tasks.email_tasks
+
+@worker_process_shutdown.connect
+def _flush_analytics_events(**kwargs):
+    """Write this child's buffered analytics events before it exits."""
+    from app.services.analytics import flush_events
+    flush_events()
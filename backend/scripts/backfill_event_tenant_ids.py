@@ -0,0 +1,61 @@
+"""
+Migration script to backfill `tenant_id` on analytics events from their owner.
+Tenant dashboards count events by tenant_id, so older events without it are
+not counted until this runs.
+"""
+
+import asyncio
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateMany
+from app.models.analytics import AnalyticsEvent
+from app.models.user import User
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+async def backfill_event_tenant_ids():
+    """
+    Set tenant_id on every event that lacks it, using the owning user's tenant.
+    """
+    # Initialize database connection
+    mongo_url = os.getenv("MONGODB_URI", "mongodb://localhost:27017/waypoint_db")
+    # Extract database name from URI if present
+    db_name = mongo_url.split("/")[-1] if "/" in mongo_url else "waypoint_db"
+
+    client = AsyncIOMotorClient(mongo_url)
+    database = client[db_name]
+
+    await init_beanie(
+        database=database,
+        document_models=[AnalyticsEvent, User]
+    )
+
+    print(f"Starting migration to backfill analytics event tenant_id in database: {db_name}...")
+
+    cursor = User.get_pymongo_collection().find(
+        {"tenant_id": {"$type": "string"}},
+        {"_id": 1, "tenant_id": 1}
+    )
+    updates = [
+        UpdateMany(
+            {"owner_id": str(user["_id"]), "tenant_id": None},
+            {"$set": {"tenant_id": user["tenant_id"]}}
+        )
+        async for user in cursor
+    ]
+
+    modified = 0
+    if updates:
+        result = await AnalyticsEvent.get_pymongo_collection().bulk_write(updates, ordered=False)
+        modified = result.modified_count
+
+    print(f"\nMigration complete!")
+    print(f"  Users with a tenant: {len(updates)}")
+    print(f"  Successfully updated: {modified} events")
+
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(backfill_event_tenant_ids())
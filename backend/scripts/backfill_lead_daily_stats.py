@@ -0,0 +1,27 @@
+"""
+Migration script to backfill lead_daily_stats for days before the hourly
+rollup started running (the beat task only re-rolls the last 2 days).
+
+Usage: python scripts/backfill_lead_daily_stats.py [days]   (default 400)
+"""
+
+import sys
+import logging
+from dotenv import load_dotenv
+
+load_dotenv()
+logging.basicConfig(level=logging.INFO)  # Rollup errors are logged, not raised
+
+from app.tasks.lead_tasks import rollup_lead_daily_stats_task
+
+def backfill_lead_daily_stats(days: int):
+    """
+    Run the rollup in-process over the last `days` complete UTC days
+    (idempotent: existing rows are replaced).
+    """
+    print(f"Starting backfill of lead_daily_stats for the last {days} days...")
+    rollup_lead_daily_stats_task(days=days)
+    print(f"\nBackfill complete!")
+
+if __name__ == "__main__":
+    backfill_lead_daily_stats(int(sys.argv[1]) if len(sys.argv) > 1 else 400)
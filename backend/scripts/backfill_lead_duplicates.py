@@ -0,0 +1,44 @@
+"""
+Migration script to backfill the `is_duplicate` flag
+for all existing duplicate-rejected leads in the database.
+"""
+
+import asyncio
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.models.lead import Lead
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+async def backfill_lead_duplicates():
+    """
+    Set is_duplicate on leads rejected as duplicates.
+    """
+    # Initialize database connection
+    mongo_url = os.getenv("MONGODB_URI", "mongodb://localhost:27017/waypoint_db")
+    # Extract database name from URI if present
+    db_name = mongo_url.split("/")[-1] if "/" in mongo_url else "waypoint_db"
+    
+    client = AsyncIOMotorClient(mongo_url)
+    database = client[db_name]
+    
+    await init_beanie(
+        database=database,
+        document_models=[Lead]
+    )
+    
+    print(f"Starting migration to backfill is_duplicate in database: {db_name}...")
+    
+    result = await Lead.find(
+        {"status": "rejected", "rejection_reason": {"$regex": "Duplicate"}}
+    ).update({"$set": {"is_duplicate": True}})
+    
+    print(f"\nMigration complete!")
+    print(f"  Successfully updated: {result.modified_count} leads")
+    
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(backfill_lead_duplicates())
@@ -0,0 +1,70 @@
+"""
+Migration script to backfill the stored merged `permissions` list
+for all existing users in the database.
+"""
+
+import asyncio
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.models.user import User
+from app.models.role import Role as RoleDocument
+from app.core.roles import merge_role_permissions
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+async def backfill_user_permissions():
+    """
+    Backfill permissions for all existing users.
+    """
+    # Initialize database connection
+    mongo_url = os.getenv("MONGODB_URI", "mongodb://localhost:27017/waypoint_db")
+    # Extract database name from URI if present
+    db_name = mongo_url.split("/")[-1] if "/" in mongo_url else "waypoint_db"
+    
+    client = AsyncIOMotorClient(mongo_url)
+    database = client[db_name]
+    
+    await init_beanie(
+        database=database,
+        document_models=[User, RoleDocument]
+    )
+    
+    print(f"Starting migration to backfill user permissions in database: {db_name}...")
+    
+    users = await User.find_all().to_list()
+    print(f"Found {len(users)} users")
+    
+    role_permissions = {}
+    updated_count = 0
+    error_count = 0
+    
+    for user in users:
+        try:
+            custom_permissions = None
+            if user.role_id:
+                if user.role_id not in role_permissions:
+                    role_doc = await RoleDocument.get(user.role_id)
+                    role_permissions[user.role_id] = role_doc.permissions if role_doc else None
+                custom_permissions = role_permissions[user.role_id]
+            
+            await User.find_one(User.id == user.id).update(
+                {"$set": {"permissions": merge_role_permissions(user.role, custom_permissions)}}
+            )
+            updated_count += 1
+            if updated_count % 100 == 0:
+                print(f"  Updated {updated_count} users...")
+        
+        except Exception as e:
+            error_count += 1
+            print(f"  Error processing user {user.id}: {e}")
+    
+    print(f"\nMigration complete!")
+    print(f"  Successfully updated: {updated_count} users")
+    print(f"  Errors: {error_count}")
+    
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(backfill_user_permissions())
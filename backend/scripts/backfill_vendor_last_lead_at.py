@@ -0,0 +1,58 @@
+"""
+Migration script to backfill `last_lead_at` on vendors from their existing leads.
+Vendors without it are treated as having no leads by the source stats endpoint.
+"""
+
+import asyncio
+from beanie import init_beanie, PydanticObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from app.models.lead import Lead
+from app.models.vendor import Vendor
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+async def backfill_vendor_last_lead_at():
+    """
+    Set last_lead_at on every vendor to the created_at of its newest lead.
+    """
+    # Initialize database connection
+    mongo_url = os.getenv("MONGODB_URI", "mongodb://localhost:27017/waypoint_db")
+    # Extract database name from URI if present
+    db_name = mongo_url.split("/")[-1] if "/" in mongo_url else "waypoint_db"
+    
+    client = AsyncIOMotorClient(mongo_url)
+    database = client[db_name]
+    
+    await init_beanie(
+        database=database,
+        document_models=[Lead, Vendor]
+    )
+    
+    print(f"Starting migration to backfill vendor last_lead_at in database: {db_name}...")
+    
+    rows = await Lead.get_pymongo_collection().aggregate([
+        {"$group": {"_id": "$vendor_id", "last_lead_at": {"$max": "$created_at"}}}
+    ]).to_list(None)
+    
+    updates = [
+        UpdateOne({"_id": PydanticObjectId(row["_id"])}, {"$max": {"last_lead_at": row["last_lead_at"]}})
+        for row in rows
+        if row["_id"] and PydanticObjectId.is_valid(row["_id"])
+    ]
+    
+    modified = 0
+    if updates:
+        result = await Vendor.get_pymongo_collection().bulk_write(updates, ordered=False)
+        modified = result.modified_count
+    
+    print(f"\nMigration complete!")
+    print(f"  Vendors with leads: {len(updates)}")
+    print(f"  Successfully updated: {modified} vendors")
+    
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(backfill_vendor_last_lead_at())
@@ -0,0 +1,41 @@
+"""
+Migration script to drop the wildcard ($**) text index from the leads
+collection (Beanie never drops indexes on its own).
+"""
+
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+async def drop_lead_text_index():
+    """
+    Drop every text index on leads; no query uses $text.
+    """
+    # Initialize database connection
+    mongo_url = os.getenv("MONGODB_URI", "mongodb://localhost:27017/waypoint_db")
+    # Extract database name from URI if present
+    db_name = mongo_url.split("/")[-1] if "/" in mongo_url else "waypoint_db"
+    
+    client = AsyncIOMotorClient(mongo_url)
+    collection = client[db_name]["leads"]
+    
+    print(f"Dropping text indexes on leads in database: {db_name}...")
+    
+    dropped = 0
+    for name, info in (await collection.index_information()).items():
+        # Text indexes are stored with an "_fts" key
+        if any(field == "_fts" for field, _ in info["key"]):
+            await collection.drop_index(name)
+            print(f"  Dropped {name}")
+            dropped += 1
+    
+    print(f"\nMigration complete!")
+    print(f"  Dropped: {dropped} indexes")
+    
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(drop_lead_text_index())
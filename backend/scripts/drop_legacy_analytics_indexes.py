@@ -0,0 +1,51 @@
+"""
+Migration script to drop the single-field analytics_events indexes that were
+replaced by compound indexes (Beanie never drops indexes on its own).
+"""
+
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LEGACY_INDEXES = [
+    "owner_id_1",
+    "event_type_1",
+    "source_id_1",
+    "vendor_id_1",
+    "customer_id_1",
+    "campaign_id_1",
+    "timestamp_1",
+]
+
+async def drop_legacy_analytics_indexes():
+    """
+    Drop legacy single-field indexes from analytics_events, if present.
+    """
+    # Initialize database connection
+    mongo_url = os.getenv("MONGODB_URI", "mongodb://localhost:27017/waypoint_db")
+    # Extract database name from URI if present
+    db_name = mongo_url.split("/")[-1] if "/" in mongo_url else "waypoint_db"
+    
+    client = AsyncIOMotorClient(mongo_url)
+    collection = client[db_name]["analytics_events"]
+    
+    print(f"Dropping legacy analytics_events indexes in database: {db_name}...")
+    
+    existing = await collection.index_information()
+    dropped = 0
+    for name in LEGACY_INDEXES:
+        if name in existing:
+            await collection.drop_index(name)
+            print(f"  Dropped {name}")
+            dropped += 1
+    
+    print(f"\nMigration complete!")
+    print(f"  Dropped: {dropped} indexes")
+    
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(drop_legacy_analytics_indexes())
@@ -0,0 +1,51 @@
+"""
+Migration script to drop leads indexes that were removed from the Lead model
+(Beanie never drops indexes on its own).
+"""
+
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LEGACY_INDEXES = [
+    # Prefixes of the compound (tenant_id, ...), (owner_id, created_at) and
+    # (source_id, ...) indexes
+    "tenant_id_1",
+    "owner_id_1",
+    "source_id_1",
+    # Case-insensitive email search can't use tight bounds on it
+    "tenant_id_1_data.email_1",
+]
+
+async def drop_redundant_lead_indexes():
+    """
+    Drop removed indexes from leads, if present.
+    """
+    # Initialize database connection
+    mongo_url = os.getenv("MONGODB_URI", "mongodb://localhost:27017/waypoint_db")
+    # Extract database name from URI if present
+    db_name = mongo_url.split("/")[-1] if "/" in mongo_url else "waypoint_db"
+    
+    client = AsyncIOMotorClient(mongo_url)
+    collection = client[db_name]["leads"]
+    
+    print(f"Dropping redundant leads indexes in database: {db_name}...")
+    
+    existing = await collection.index_information()
+    dropped = 0
+    for name in LEGACY_INDEXES:
+        if name in existing:
+            await collection.drop_index(name)
+            print(f"  Dropped {name}")
+            dropped += 1
+    
+    print(f"\nMigration complete!")
+    print(f"  Dropped: {dropped} indexes")
+    
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(drop_redundant_lead_indexes())
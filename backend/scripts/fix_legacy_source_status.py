@@ -0,0 +1,65 @@
+"""
+Migration script to rewrite legacy vendor/source statuses in place.
+
+Older documents stored `status: "active"` (vendors and source configs) and a
+boolean `sources.config.enabled`. The models no longer upgrade these on every
+load, so this must run once before deploying that change.
+"""
+
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+async def fix_legacy_source_status():
+    """
+    Map status "active" -> "enabled", config.enabled False -> status "disabled",
+    then drop the legacy `enabled` flag.
+    """
+    # Initialize database connection
+    mongo_url = os.getenv("MONGODB_URI", "mongodb://localhost:27017/waypoint_db")
+    # Extract database name from URI if present
+    db_name = mongo_url.split("/")[-1] if "/" in mongo_url else "waypoint_db"
+
+    client = AsyncIOMotorClient(mongo_url)
+    vendors = client[db_name]["vendors"]
+
+    print(f"Starting migration to fix legacy vendor/source statuses in database: {db_name}...")
+
+    # 1. Vendor status
+    result = await vendors.update_many({"status": "active"}, {"$set": {"status": "enabled"}})
+    print(f"  Vendors 'active' -> 'enabled': {result.modified_count}")
+    result = await vendors.update_many({"status": {"$exists": False}}, {"$set": {"status": "enabled"}})
+    print(f"  Vendors without status -> 'enabled': {result.modified_count}")
+
+    # 2. Source config status (same order as the old validator: 'active' first,
+    # then an explicit enabled=False wins)
+    result = await vendors.update_many(
+        {"sources.config.status": "active"},
+        {"$set": {"sources.$[s].config.status": "enabled"}},
+        array_filters=[{"s.config.status": "active"}]
+    )
+    print(f"  Vendors with sources 'active' -> 'enabled': {result.modified_count}")
+    result = await vendors.update_many(
+        {"sources.config.enabled": False},
+        {"$set": {"sources.$[s].config.status": "disabled"}},
+        array_filters=[{"s.config.enabled": False}]
+    )
+    print(f"  Vendors with sources enabled=False -> 'disabled': {result.modified_count}")
+
+    # 3. Drop the legacy flag
+    result = await vendors.update_many(
+        {"sources.config.enabled": {"$exists": True}},
+        {"$unset": {"sources.$[s].config.enabled": ""}},
+        array_filters=[{"s.config.enabled": {"$exists": True}}]
+    )
+    print(f"  Vendors with legacy 'enabled' flags removed: {result.modified_count}")
+
+    print(f"\nMigration complete!")
+
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(fix_legacy_source_status())